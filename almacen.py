@@ -0,0 +1,232 @@
+"""
+Almacén histórico consolidado (SQLite)
+Carga la última versión de cada salida, ya normalizada por procesamiento.py,
+en una sola tabla indexada por año, periodo y unidad, para consultar varios
+datasets a la vez sin abrir las hojas de cálculo
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from config import FOLDERS, WAREHOUSE_CONFIG
+from sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observaciones (
+    dataset TEXT NOT NULL,
+    salida TEXT NOT NULL,
+    periodo TEXT,
+    anio INTEGER,
+    unidad TEXT,
+    detalle TEXT,
+    metrica TEXT NOT NULL,
+    valor REAL NOT NULL,
+    fecha_descarga TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_observaciones_anio ON observaciones (anio, unidad);
+CREATE INDEX IF NOT EXISTS idx_observaciones_unidad ON observaciones (unidad, anio);
+CREATE INDEX IF NOT EXISTS idx_observaciones_periodo ON observaciones (periodo);
+CREATE INDEX IF NOT EXISTS idx_observaciones_dataset ON observaciones (dataset, metrica, anio);
+CREATE INDEX IF NOT EXISTS idx_observaciones_salida ON observaciones (salida);
+CREATE TABLE IF NOT EXISTS cargas (
+    salida TEXT PRIMARY KEY,
+    dataset TEXT,
+    ruta TEXT NOT NULL,
+    timestamp TEXT,
+    filas INTEGER,
+    cargado TEXT
+);
+"""
+
+COLUMNS = ("dataset", "salida", "periodo", "anio", "unidad", "detalle", "metrica", "valor", "fecha_descarga")
+
+
+class Warehouse(SQLiteStore):
+    """Tabla larga de observaciones de todos los datasets, una versión por salida"""
+    
+    def __init__(self, path=None):
+        """
+        Abre (o crea) el almacén
+        
+        Args:
+            path (str): Ruta de la base SQLite (por defecto WAREHOUSE_CONFIG["file"])
+        """
+        super().__init__(path or WAREHOUSE_CONFIG["file"], SCHEMA)
+    
+    def query(self, sql, params=()):
+        """
+        Ejecuta una consulta de solo lectura
+        
+        Usa una conexión aparte abierta en modo ro, así que una sentencia que
+        escriba (p. ej. desde --sql) falla en lugar de modificar el almacén.
+        
+        Args:
+            sql (str): Consulta SQL
+            params (tuple): Parámetros
+        
+        Returns:
+            list: Filas como diccionarios
+        """
+        uri = f"{Path(os.path.abspath(self.path)).as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only=ON")
+            # ATTACH abriría (o crearía) otra base fuera del modo ro
+            conn.set_authorizer(
+                lambda accion, *_: sqlite3.SQLITE_DENY if accion == sqlite3.SQLITE_ATTACH else sqlite3.SQLITE_OK
+            )
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+    
+    def loaded(self):
+        """
+        Versión cargada de cada salida
+        
+        Returns:
+            dict: {salida: registro de la tabla cargas}
+        """
+        return {r["salida"]: r for r in self._query("SELECT * FROM cargas")}
+    
+    def load(self, registro, df):
+        """
+        Reemplaza las observaciones de una salida en una sola transacción
+        
+        Args:
+            registro (dict): Registro del catálogo del archivo de origen
+            df (DataFrame): Tabla en formato largo (procesamiento.tidy_table)
+        
+        Returns:
+            int: Filas cargadas
+        """
+        df = df.copy()
+        df["fecha_descarga"] = df["fecha_descarga"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+        df = df[list(COLUMNS)].astype(object)
+        filas = df.where(df.notna(), None).itertuples(index=False, name=None)
+        
+        marcas = ", ".join("?" * len(COLUMNS))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM observaciones WHERE salida = ?", (registro["salida"],))
+            self._conn.executemany(
+                f"INSERT INTO observaciones ({', '.join(COLUMNS)}) VALUES ({marcas})", filas
+            )
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cargas (salida, dataset, ruta, timestamp, filas, cargado)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    registro["salida"], registro["dataset"], registro["ruta"], registro["timestamp"],
+                    len(df), datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        return len(df)
+    
+    def update(self, catalog=None, force=False):
+        """
+        Carga las salidas cuya última descarga aún no está en el almacén
+        
+        Args:
+            catalog (DownloadCatalog): Catálogo (por defecto se abre uno)
+            force (bool): Recargar todas las salidas
+        
+        Returns:
+            list: [{"salida", "estado", "filas"}] con estado "ok", "al_dia" o "error"
+        """
+        import pandas as pd
+        from catalog import DownloadCatalog
+        from procesamiento import process_file
+        
+        propio = catalog is None
+        catalog = catalog or DownloadCatalog()
+        try:
+            registros = catalog.latest_per_output()
+        finally:
+            if propio:
+                catalog.close()
+        
+        os.makedirs(FOLDERS["tidy"], exist_ok=True)
+        cargados = self.loaded()
+        resultados = []
+        for salida, registro in sorted(registros.items()):
+            if not registro["dataset"]:
+                continue
+            if not force and salida in cargados and cargados[salida]["ruta"] == registro["ruta"]:
+                resultados.append({"salida": salida, "estado": "al_dia", "filas": cargados[salida]["filas"]})
+                continue
+            
+            procesado = process_file(registro, force)
+            if procesado["estado"] == "error":
+                resultados.append({"salida": salida, "estado": "error", "error": procesado["error"]})
+                continue
+            
+            filas = self.load(registro, pd.read_parquet(procesado["destino"]))
+            resultados.append({"salida": salida, "estado": "ok", "filas": filas})
+        
+        if any(r["estado"] == "ok" for r in resultados):
+            # Estadísticas de los índices para el planificador de consultas
+            with self._lock:
+                self._conn.execute("ANALYZE")
+        return resultados
+
+
+def print_rows(filas):
+    """Imprime filas de una consulta como tabla de texto"""
+    if not filas:
+        print("(sin resultados)")
+        return
+    
+    columnas = list(filas[0].keys())
+    textos = [["" if f[c] is None else str(f[c]) for c in columnas] for f in filas]
+    anchos = [max(len(c), *(len(t[i]) for t in textos)) for i, c in enumerate(columnas)]
+    print("  ".join(c.ljust(a) for c, a in zip(columnas, anchos)))
+    print("  ".join("-" * a for a in anchos))
+    for t in textos:
+        print("  ".join(v.ljust(a) for v, a in zip(t, anchos)))
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Almacén histórico consolidado de indicadores UABC")
+    parser.add_argument("--forzar", action="store_true", help="Recargar todas las salidas")
+    parser.add_argument("--sql", help="Consulta a ejecutar en lugar de actualizar")
+    args = parser.parse_args()
+    
+    warehouse = Warehouse()
+    try:
+        if args.sql:
+            try:
+                print_rows(warehouse.query(args.sql))
+            except sqlite3.Error as e:
+                print(f"❌ {e}")
+                return 1
+            return 0
+        
+        resultados = warehouse.update(force=args.forzar)
+    finally:
+        warehouse.close()
+    
+    print("\n" + "="*80)
+    print("ALMACÉN HISTÓRICO")
+    print("="*80)
+    for r in resultados:
+        if r["estado"] == "ok":
+            print(f"  ✓ {r['salida']:<45} {r['filas']:>8} filas cargadas")
+        elif r["estado"] == "al_dia":
+            print(f"  = {r['salida']:<45} al día ({r['filas']} filas)")
+        else:
+            print(f"  ✗ {r['salida']:<45} {r['error']}")
+    print(f"\nBase: {os.path.abspath(WAREHOUSE_CONFIG['file'])}")
+    print("="*80)
+    
+    return 1 if any(r["estado"] == "error" for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Logging asíncrono y estructurado
+Los workers solo encolan registros (QueueHandler); un hilo aparte (QueueListener)
+los escribe en consola, en el .log de texto y en un .jsonl con un objeto por línea
+(dataset, fase, segundos, resultado...) para analizar las ejecuciones
+"""
+
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+from pathlib import Path
+
+from config import FOLDERS, LOGGING_CONFIG
+
+
+# Logger de los motores de extracción
+LOGGER_NAME = "uabc_scraper"
+
+# Campos estructurados que log_message agrega a cada registro (extra=...)
+FIELDS = ("run", "worker", "dataset", "fase", "segundos", "resultado", "intentos", "archivos")
+
+_listener = None
+_queue_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por registro con los campos estructurados presentes"""
+    
+    def format(self, record):
+        registro = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "hilo": record.threadName,
+            "mensaje": record.getMessage().strip(),
+        }
+        for campo in FIELDS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                registro[campo] = valor
+        if record.exc_info:
+            registro["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False)
+
+
+def _level(nombre):
+    """Convierte "DEBUG", "INFO"... en el nivel numérico de logging"""
+    return logging.getLevelName(nombre.upper()) if isinstance(nombre, str) else nombre
+
+
+def start_logging(console_level=None, file_level=None, log_dir=None):
+    """
+    Instala el QueueHandler en el logger raíz y arranca el hilo que escribe
+    
+    Si ya está activo no hace nada, así que quien llame primero (p. ej. cli.py
+    con -v/-q) decide la verbosidad y los scrapers reutilizan la configuración.
+    
+    Args:
+        console_level (str): Nivel mínimo en consola (por defecto LOGGING_CONFIG["console_level"])
+        file_level (str): Nivel mínimo en los archivos (por defecto LOGGING_CONFIG["file_level"])
+        log_dir (str): Carpeta de logs (por defecto FOLDERS["logs"])
+    
+    Returns:
+        bool: True si se acaba de configurar
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return False
+    
+    console_level = _level(console_level or LOGGING_CONFIG["console_level"])
+    file_level = _level(file_level or LOGGING_CONFIG["file_level"])
+    
+    log_dir = Path(log_dir or FOLDERS["logs"])
+    log_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    texto = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = []
+    
+    consola = logging.StreamHandler()
+    consola.setLevel(console_level)
+    consola.setFormatter(texto)
+    handlers.append(consola)
+    
+    archivo = logging.FileHandler(log_dir / f"scraper_{timestamp}.log", encoding="utf-8")
+    archivo.setLevel(file_level)
+    archivo.setFormatter(texto)
+    handlers.append(archivo)
+    
+    if LOGGING_CONFIG["json"]:
+        estructurado = logging.FileHandler(log_dir / f"scraper_{timestamp}.jsonl", encoding="utf-8")
+        estructurado.setLevel(file_level)
+        estructurado.setFormatter(JsonFormatter())
+        handlers.append(estructurado)
+    
+    _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    # Las bibliotecas (selenium, urllib3) siguen en INFO; el logger del
+    # scraper baja a DEBUG solo si algún destino lo pide
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(_queue_handler)
+    logging.getLogger(LOGGER_NAME).setLevel(min(console_level, file_level))
+    
+    atexit.register(stop_logging)
+    return True
+
+
+def stop_logging():
+    """Vacía la cola, detiene el hilo escritor y cierra los archivos"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
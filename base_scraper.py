@@ -0,0 +1,481 @@
+"""
+Base común para los motores de extracción de indicadores UABC
+Concentra logging, carpetas, estadísticas y el pool de workers
+"""
+
+import os
+import copy
+import time
+import importlib.util
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from config import (
+    BASE_URL, DATASETS, FOLDERS, PARALLEL_CONFIG, CHANGE_DETECTION, RETRY_CONFIG, METRICS_CONFIG, WAREHOUSE_CONFIG
+)
+from fingerprints import FingerprintStore, fingerprint_key
+from journal import RunJournal
+from catalog import DownloadCatalog
+from rate_limiter import AdaptiveRateLimiter
+from metrics import RunMetrics
+from history import RunHistory
+from async_logging import LOGGER_NAME, start_logging, stop_logging
+
+
+# Resultados posibles de extract_dataset
+RESULT_OK = "ok"
+RESULT_SKIPPED = "omitido"
+RESULT_FAILED = "fallido"
+RESULT_UNSUPPORTED = "no_soportado"  # Falla que no tiene sentido reintentar
+
+
+class BaseScraper:
+    """Funcionalidad compartida por los motores de extracción"""
+    
+    # Modo con el que se guardan las huellas (cada motor genera archivos distintos)
+    fingerprint_mode = "base"
+    
+    def __init__(self, resume=False):
+        """
+        Inicializa logging, carpetas y estadísticas
+        
+        Args:
+            resume (bool): Si es True, reanuda la última ejecución de la bitácora
+                y omite los datasets y filtros que ya se completaron
+        """
+        self.base_url = BASE_URL
+        self.datasets = DATASETS
+        self.worker_id = None
+        self.current_dataset = None
+        self.journal = None
+        self.setup_logging()
+        self.setup_folders()
+        
+        # Bitácora de la ejecución (compartida por los workers)
+        self.journal = RunJournal()
+        
+        # Catálogo de archivos almacenados (compartido por los workers)
+        self.catalog = DownloadCatalog()
+        
+        # Archivos que generó el dataset en curso (cada worker tiene los suyos)
+        self.outputs = []
+        
+        # Historial entre ejecuciones (compartido por los workers)
+        self.history = RunHistory()
+        
+        # Limitador de peticiones compartido por todos los workers
+        self.rate_limiter = AdaptiveRateLimiter()
+        
+        # Huellas de contenido para omitir datasets sin cambios
+        self.fingerprints = FingerprintStore()
+        self.skip_unchanged = CHANGE_DETECTION["enabled"]
+        
+        # Lock compartido por los workers para actualizar las estadísticas
+        self._stats_lock = threading.Lock()
+        self.reset_run(resume)
+        
+    def reset_run(self, resume=False, total=None):
+        """
+        Inicia una ejecución: bitácora, estadísticas y tiempos por fase nuevos
+        
+        Lo llama __init__ y también el daemon antes de cada trabajo, para
+        reutilizar el mismo scraper (y su navegador) en varias ejecuciones.
+        
+        Args:
+            resume (bool): Si es True, reanuda la última ejecución de la bitácora
+            total (int): Número de datasets de la ejecución (por defecto todos)
+        """
+        run_id = self.journal.start_run(resume)
+        self.log_message(f"{'Reanudando' if resume else 'Iniciando'} ejecución {run_id}")
+        
+        # Tiempos por fase (compartidos por los workers)
+        self.metrics = RunMetrics(on_record=self.log_span)
+        self.stats = {
+            "total": len(DATASETS) if total is None else total,
+            "exitosos": 0,
+            "fallidos": 0,
+            "omitidos": 0,
+            "no_soportados": 0,
+            "reanudados": 0,
+            "inicio": datetime.now()
+        }
+        
+    def setup_folders(self):
+        """Crea las carpetas necesarias si no existen"""
+        for folder in FOLDERS.values():
+            Path(folder).mkdir(parents=True, exist_ok=True)
+        self.log_message("Carpetas creadas/verificadas", "INFO")
+    
+    def setup_logging(self):
+        """Configura el logging asíncrono (ver async_logging y LOGGING_CONFIG)"""
+        # Si cli.py ya lo configuró con -v/-q se conserva su verbosidad
+        start_logging()
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.info("INICIANDO WEB SCRAPER - INDICADORES UABC")
+    
+    def log_message(self, message, level="INFO", **campos):
+        """
+        Registra un mensaje en el log
+        
+        El registro solo se encola; el hilo de async_logging lo escribe.
+        
+        Args:
+            message (str): Mensaje
+            level (str): "DEBUG", "INFO", "WARNING" o "ERROR"
+            **campos: Campos estructurados para el .jsonl (fase, segundos, resultado...)
+        """
+        nivel = logging.getLevelName(level)
+        if not self.logger.isEnabledFor(nivel):
+            return
+        
+        if self.worker_id is not None:
+            message = f"[worker {self.worker_id}] {message}"
+        
+        extra = {
+            "run": self.journal.run_id if self.journal else None,
+            "worker": self.worker_id,
+            "dataset": self.current_dataset,
+        }
+        extra.update(campos)
+        self.logger.log(nivel, message, extra=extra)
+    
+    def log_span(self, span):
+        """Registra en el log (nivel DEBUG) la duración de una fase medida con span()"""
+        self.log_message(
+            f"Fase {span['fase']}: {span['segundos']:.2f} s", "DEBUG",
+            dataset=span["dataset"], fase=span["fase"], segundos=round(span["segundos"], 3),
+            resultado="ok" if span["ok"] else "error",
+        )
+    
+    def span(self, fase):
+        """
+        Mide un bloque de código como fase del dataset en curso
+        
+        Uso: `with self.span("carga_pagina"): ...`
+        
+        Args:
+            fase (str): Nombre de la fase
+        """
+        return self.metrics.span(fase, self.current_dataset)
+    
+    def extract_dataset(self, dataset):
+        """
+        Realiza un intento de extracción de un dataset (implementado por cada motor)
+        
+        Los archivos generados se agregan a self.outputs.
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+            
+        Returns:
+            str: RESULT_OK, RESULT_SKIPPED, RESULT_FAILED o RESULT_UNSUPPORTED
+        """
+        raise NotImplementedError
+    
+    def scrape_dataset(self, dataset):
+        """
+        Extrae un dataset con reintentos, registrándolo en la bitácora y las estadísticas
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+            
+        Returns:
+            bool: True si fue exitoso, False si falló
+        """
+        nombre = dataset["nombre"]
+        
+        if self.journal.is_done(nombre):
+            self.log_message(f"{nombre} ya se completó en esta ejecución, se omite")
+            self.record_result(True, resumed=True)
+            return True
+        
+        self.current_dataset = nombre
+        max_attempts = RETRY_CONFIG["max_attempts"]
+        inicio = time.perf_counter()
+        with self.span("dataset"):
+            for intento in range(1, max_attempts + 1):
+                self.outputs = []
+                resultado = self.extract_dataset(dataset)
+                
+                if resultado != RESULT_FAILED or intento == max_attempts:
+                    break
+                
+                # Backoff exponencial entre intentos
+                espera = min(RETRY_CONFIG["backoff_base"] * 2 ** (intento - 1), RETRY_CONFIG["backoff_max"])
+                self.log_message(f"Intento {intento}/{max_attempts} fallido, reintentando en {espera:.0f} s", "WARNING")
+                with self.span("espera_reintento"):
+                    time.sleep(espera)
+        
+        segundos = time.perf_counter() - inicio
+        self.journal.record(nombre, resultado, self.outputs, intento)
+        self.history.record(self.journal.run_id, nombre, resultado, segundos, self.outputs, intento)
+        self.log_message(
+            f"{nombre}: {resultado} en {segundos:.1f} s", "INFO" if resultado != RESULT_FAILED else "WARNING",
+            fase="dataset", segundos=round(segundos, 3), resultado=resultado,
+            intentos=intento, archivos=len(self.outputs),
+        )
+        
+        success = resultado in (RESULT_OK, RESULT_SKIPPED)
+        self.record_result(success, skipped=resultado == RESULT_SKIPPED, unsupported=resultado == RESULT_UNSUPPORTED)
+        return success
+    
+    def add_output(self, filepath, filas=None, columnas=None):
+        """
+        Registra un archivo recién escrito en el catálogo y en la lista del dataset en curso
+        
+        Args:
+            filepath (str): Ruta del archivo
+            filas (int): Número de filas de datos, si se conoce
+            columnas (int): Número de columnas, si se conoce
+        """
+        self.outputs.append(filepath)
+        self.catalog.register(filepath, self.current_dataset, filas, columnas)
+    
+    def record_result(self, success, skipped=False, unsupported=False, resumed=False):
+        """
+        Registra el resultado de un dataset en las estadísticas compartidas
+        
+        Args:
+            success (bool): True si el dataset se extrajo correctamente
+            skipped (bool): True si se omitió por no tener cambios (cuenta como exitoso)
+            unsupported (bool): True si este motor no puede extraerlo (no cuenta como fallido)
+            resumed (bool): True si ya estaba completo en la ejecución reanudada (cuenta como exitoso)
+        """
+        with self._stats_lock:
+            if skipped:
+                self.stats["omitidos"] += 1
+            if resumed:
+                self.stats["reanudados"] += 1
+            if success:
+                self.stats["exitosos"] += 1
+            elif unsupported:
+                self.stats["no_soportados"] += 1
+            else:
+                self.stats["fallidos"] += 1
+    
+    def is_unchanged(self, salida, fingerprint):
+        """
+        Indica si una salida puede omitirse porque su contenido no cambió
+        
+        Args:
+            salida (str): Dataset o sufijo de la variante de filtro
+            fingerprint (dict): Huella actual de la tabla
+            
+        Returns:
+            bool: True si la detección de cambios está activa, la huella coincide
+                con la de este modo y su archivo sigue en disco
+        """
+        clave = fingerprint_key(salida, self.fingerprint_mode)
+        if not self.skip_unchanged or not self.fingerprints.is_unchanged(clave, fingerprint):
+            return False
+        
+        self.log_message(f"{salida} sin cambios desde la última extracción ({fingerprint['filas']} filas), se omite")
+        return True
+    
+    def save_fingerprint(self, salida, fingerprint, archivos):
+        """
+        Registra la huella de una salida recién escrita en este modo
+        
+        Args:
+            salida (str): Dataset o sufijo de la variante de filtro
+            fingerprint (dict): Huella de la tabla
+            archivos (list): Archivos generados
+        """
+        self.fingerprints.update(fingerprint_key(salida, self.fingerprint_mode), fingerprint, archivos)
+    
+    def spawn_worker(self, worker_id):
+        """
+        Crea un worker independiente para el modo paralelo
+        
+        El worker comparte logger, estadísticas y configuración con este scraper,
+        de modo que los resultados se acumulan en el mismo diccionario `stats`.
+        Cada motor extiende este método para crear sus propios recursos.
+        
+        Args:
+            worker_id (int): Identificador del worker
+            
+        Returns:
+            BaseScraper: Copia del scraper lista para extraer datasets
+        """
+        worker = copy.copy(self)
+        worker.worker_id = worker_id
+        worker.current_dataset = None
+        worker.outputs = []
+        return worker
+    
+    def scrape_datasets(self, datasets, workers=None):
+        """
+        Extrae una lista de datasets, en serie o con un pool de workers
+        
+        Args:
+            datasets (list): Datasets a extraer
+            workers (int): Número de workers en paralelo
+                (por defecto PARALLEL_CONFIG["workers"])
+        """
+        if workers is None:
+            workers = PARALLEL_CONFIG["workers"]
+        workers = max(1, min(workers, len(datasets), PARALLEL_CONFIG["max_workers_per_host"]))
+        
+        if workers == 1:
+            for i, dataset in enumerate(datasets, 1):
+                self.log_message(f"\n[{i}/{len(datasets)}] Procesando...")
+                self.scrape_dataset(dataset)
+            return
+        
+        self.log_message(f"Modo paralelo: {workers} workers")
+        
+        pendientes = queue.Queue()
+        for dataset in datasets:
+            pendientes.put(dataset)
+        
+        def run_worker(worker_id):
+            # El worker 0 reutiliza el driver de este scraper
+            worker = None
+            try:
+                worker = self if worker_id == 0 else self.spawn_worker(worker_id)
+                while True:
+                    try:
+                        dataset = pendientes.get_nowait()
+                    except queue.Empty:
+                        return
+                    worker.scrape_dataset(dataset)
+            except Exception as e:
+                self.log_message(f"Error en worker {worker_id}: {e}", "ERROR")
+            finally:
+                if worker is not None and worker is not self:
+                    worker.close()
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper") as executor:
+            list(executor.map(run_worker, range(workers)))
+        
+        # Datasets que quedaron sin procesar porque su worker no pudo iniciar
+        while not pendientes.empty():
+            dataset = pendientes.get_nowait()
+            self.log_message(f"Dataset no procesado: {dataset['nombre']}", "ERROR")
+            self.record_result(False)
+    
+    def scrape_all(self, workers=None):
+        """
+        Extrae todos los datasets configurados
+        
+        Args:
+            workers (int): Número de workers en paralelo
+        """
+        self.log_message(f"\nIniciando extracción de {len(self.datasets)} datasets...")
+        
+        self.scrape_datasets(self.datasets, workers)
+        
+        self.print_summary()
+    
+    def scrape_priority(self, priority=1, workers=None):
+        """
+        Extrae solo los datasets con prioridad específica
+        
+        Args:
+            priority (int): Nivel de prioridad (1 = más importante)
+            workers (int): Número de workers en paralelo
+        """
+        datasets_filtered = [d for d in self.datasets if d.get("prioridad") == priority]
+        
+        self.log_message(f"\nExtrayendo {len(datasets_filtered)} datasets con prioridad {priority}...")
+        
+        self.scrape_datasets(datasets_filtered, workers)
+        
+        self.print_summary()
+    
+    def print_summary(self):
+        """Imprime resumen de la ejecución"""
+        # Antes del resumen para que su tiempo aparezca en la tabla de fases
+        self.update_warehouse()
+        
+        duracion = datetime.now() - self.stats["inicio"]
+        
+        self.log_message("\n" + "="*80)
+        self.log_message("RESUMEN DE EJECUCIÓN")
+        self.log_message("="*80)
+        self.log_message(f"Total de datasets: {self.stats['total']}")
+        self.log_message(f"Exitosos: {self.stats['exitosos']} ✓")
+        self.log_message(f"Fallidos: {self.stats['fallidos']} ✗")
+        self.log_message(f"Omitidos sin cambios: {self.stats['omitidos']}")
+        if self.stats["reanudados"]:
+            self.log_message(f"Completados antes de reanudar: {self.stats['reanudados']}")
+        if self.stats["no_soportados"]:
+            self.log_message(f"No soportados por este motor: {self.stats['no_soportados']}")
+        self.log_message(f"Tasa de éxito: {(self.stats['exitosos']/self.stats['total']*100):.1f}%")
+        self.log_message(f"Duración: {duracion}")
+        self.log_message(f"Archivos guardados en: {os.path.abspath(FOLDERS['raw'])}")
+        
+        fases = self.metrics.by_phase()
+        if fases:
+            self.log_message("-"*80)
+            self.log_message("Tiempo por fase (total / n / máximo):")
+            for fase, agregado in sorted(fases.items(), key=lambda item: -item[1]["total"]):
+                self.log_message(
+                    f"  {fase:<20} {agregado['total']:9.2f} s  {agregado['n']:5d}  {agregado['max']:8.2f} s"
+                )
+        self.log_message("="*80)
+        
+        self.export_metrics()
+    
+    def export_metrics(self):
+        """Guarda las métricas de la ejecución como JSON y para Prometheus"""
+        if not METRICS_CONFIG["enabled"]:
+            return
+        
+        run_id = self.journal.run_id
+        try:
+            json_file = METRICS_CONFIG["json_file"].format(run=run_id)
+            self.metrics.write_json(json_file, run_id, self.stats)
+            self.metrics.write_prometheus(METRICS_CONFIG["prometheus_file"], run_id, self.stats)
+            self.log_message(f"Métricas guardadas en: {json_file}")
+        except OSError as e:
+            self.log_message(f"No se pudieron guardar las métricas: {e}", "WARNING")
+    
+    def update_warehouse(self):
+        """Carga las descargas nuevas en el almacén histórico (ver almacen.py)"""
+        if not WAREHOUSE_CONFIG["update_after_scrape"]:
+            return
+        
+        # Solo hay algo que cargar si esta ejecución escribió archivos nuevos
+        descargados = self.stats["exitosos"] - self.stats["omitidos"] - self.stats["reanudados"]
+        if descargados <= 0:
+            return
+        
+        faltantes = [m for m in ("pandas", "pyarrow") if importlib.util.find_spec(m) is None]
+        if faltantes:
+            self.log_message(f"Almacén no actualizado, falta: {', '.join(faltantes)}", "WARNING")
+            return
+        
+        try:
+            from almacen import Warehouse
+            
+            with self.metrics.span("almacen"):
+                warehouse = Warehouse()
+                try:
+                    resultados = warehouse.update(self.catalog)
+                finally:
+                    warehouse.close()
+        except ImportError as e:
+            self.log_message(f"Almacén no actualizado, falta una dependencia: {e}", "WARNING")
+            return
+        except Exception as e:
+            self.log_message(f"No se pudo actualizar el almacén: {e}", "WARNING")
+            return
+        
+        cargadas = [r for r in resultados if r["estado"] == "ok"]
+        if cargadas:
+            self.log_message(f"Almacén actualizado: {len(cargadas)} salida(s), {sum(r['filas'] for r in cargadas)} filas")
+        for r in resultados:
+            if r["estado"] == "error":
+                self.log_message(f"Almacén: no se pudo procesar {r['salida']}: {r['error']}", "WARNING")
+    
+    def close(self):
+        """Libera los recursos del motor"""
+        if self.worker_id is None:
+            self.catalog.close()
+            self.history.close()
+            stop_logging()
@@ -0,0 +1,394 @@
+"""
+Benchmark sin red de los motores de extracción
+Levanta una réplica local de indicadores.uabc.mx (tblData, cbNivel y botón
+exportTableToExcel) con latencia y tamaño de tabla configurables, ejecuta el
+scraper contra ella y reporta tiempos, descargas por segundo y memoria pico
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from html import escape
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import DATASETS, SELECTORS
+
+
+COLUMNAS = ["Periodo", "Unidad académica", "Hombres", "Mujeres", "Total"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<script>
+function exportTableToExcel(tableID, filename) {{
+    var tableHTML = document.getElementById(tableID).outerHTML;
+    var link = document.createElement("a");
+    link.href = "data:application/vnd.ms-excel;charset=utf-8," + encodeURIComponent(tableHTML);
+    link.download = (filename || "excel_data") + ".xls";
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+}}
+function cargarNivel(valor) {{
+    fetch("/datos?dataset={nombre}&nivel=" + encodeURIComponent(valor))
+        .then(function (r) {{ return r.text(); }})
+        .then(function (html) {{ document.querySelector("#{tabla} tbody").innerHTML = html; }});
+}}
+</script>
+</head>
+<body>
+<a href="/indicadores/Ind_Publicos/">Regresar</a>
+<h1>{titulo}</h1>
+{select}
+<button type="button" onclick="exportTableToExcel('{tabla}', '{nombre}')">Exportar a Excel</button>
+<table id="{tabla}">
+<thead><tr>{encabezados}</tr></thead>
+<tbody>{filas}</tbody>
+</table>
+</body>
+</html>
+"""
+
+
+@lru_cache(maxsize=None)
+def synthetic_rows(nombre, nivel, rows):
+    """
+    Genera filas deterministas para un dataset y nivel de filtro
+    
+    Args:
+        nombre (str): Nombre del dataset
+        nivel (str): Opción seleccionada en cbNivel ("" = sin filtro)
+        rows (int): Número de filas
+    
+    Returns:
+        str: Filas <tr> de la tabla
+    """
+    semilla = sum(map(ord, nombre + nivel))
+    filas = []
+    for i in range(rows):
+        hombres = (semilla * 31 + i * 17) % 5000
+        mujeres = (semilla * 17 + i * 31) % 5000
+        celdas = [
+            f"{2000 + i % 25}-{1 + i % 2}",
+            escape(f"{nivel or 'Unidad'} {i % 40}"),
+            f"{hombres:,}",
+            f"{mujeres:,}",
+            f"{hombres + mujeres:,}",
+        ]
+        filas.append("<tr>" + "".join(f"<td>{c}</td>" for c in celdas) + "</tr>")
+    return "\n".join(filas)
+
+
+@lru_cache(maxsize=None)
+def render_page(nombre, rows):
+    """
+    Genera la página HTML de un dataset
+    
+    Args:
+        nombre (str): Nombre del dataset
+        rows (int): Número de filas de la tabla
+    
+    Returns:
+        bytes: Página codificada en UTF-8
+    """
+    dataset = next(d for d in DATASETS if d["nombre"] == nombre)
+    
+    select = ""
+    if dataset.get("filtros"):
+        opciones = ["Institucional"] + [f["valor"] for f in dataset["filtros"]]
+        select = (
+            f'<select id="{SELECTORS["filtro"]}" onchange="cargarNivel(this.value)">'
+            + "".join(f'<option value="{escape(o)}">{escape(o)}</option>' for o in opciones)
+            + "</select>"
+        )
+    
+    return PAGE_TEMPLATE.format(
+        titulo=escape(dataset["descripcion"]),
+        nombre=nombre,
+        tabla=SELECTORS["tabla"],
+        select=select,
+        encabezados="".join(f"<th>{escape(c)}</th>" for c in COLUMNAS),
+        filas=synthetic_rows(nombre, "", rows),
+    ).encode("utf-8")
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Responde las URLs de config.DATASETS con páginas sintéticas o grabadas"""
+    
+    # Configurados por MockSite
+    latency = 0.0
+    rows = 100
+    pages_dir = None
+    
+    routes = {d["url"].rstrip("/"): d["nombre"] for d in DATASETS}
+    
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        time.sleep(self.latency)
+        
+        if partes.path == "/datos":
+            query = parse_qs(partes.query)
+            nombre = query.get("dataset", [""])[0]
+            nivel = query.get("nivel", [""])[0]
+            if nombre not in self.routes.values():
+                return self.send_error(404)
+            return self.send_body(synthetic_rows(nombre, nivel, self.rows).encode("utf-8"))
+        
+        nombre = self.routes.get(partes.path.rstrip("/"))
+        if nombre is None:
+            return self.send_error(404)
+        
+        # Página grabada del sitio real, si existe
+        if self.pages_dir:
+            grabada = os.path.join(self.pages_dir, f"{nombre}.html")
+            if os.path.exists(grabada):
+                with open(grabada, "rb") as f:
+                    return self.send_body(f.read())
+        
+        self.send_body(render_page(nombre, self.rows))
+    
+    def send_body(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Sin salida por petición
+        pass
+
+
+class MockSite:
+    """Servidor HTTP local en un hilo de fondo"""
+    
+    def __init__(self, latency=0.0, rows=100, pages_dir=None):
+        """
+        Configura el servidor
+        
+        Args:
+            latency (float): Segundos de espera antes de cada respuesta
+            rows (int): Filas de cada tabla sintética
+            pages_dir (str): Carpeta con páginas grabadas ({nombre}.html)
+        """
+        handler = type("Handler", (MockSiteHandler,), {
+            "latency": latency,
+            "rows": rows,
+            "pages_dir": os.path.abspath(pages_dir) if pages_dir else None,
+        })
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+def timed(engine_cls):
+    """
+    Crea una subclase del motor que mide el tiempo de cada dataset
+    
+    Los workers son copias del scraper, así que comparten el diccionario `timings`.
+    
+    Args:
+        engine_cls (type): UabcScraper o HttpScraper
+    
+    Returns:
+        type: Subclase instrumentada
+    """
+    class Timed(engine_cls):
+        def scrape_dataset(self, dataset):
+            inicio = time.perf_counter()
+            success = False
+            try:
+                success = super().scrape_dataset(dataset)
+                return success
+            finally:
+                self.timings[dataset["nombre"]] = {
+                    "segundos": time.perf_counter() - inicio,
+                    "exitoso": success,
+                }
+    
+    Timed.__name__ = f"Timed{engine_cls.__name__}"
+    return Timed
+
+
+def peak_rss_mb():
+    """
+    Memoria residente máxima del proceso y de sus hijos ya terminados (Chrome, chromedriver)
+    
+    Returns:
+        tuple: (MB propios, MB de procesos hijos) o (None, None) sin el módulo resource
+    """
+    if resource is None:
+        return None, None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    escala = 1024 * 1024 if sys.platform == "darwin" else 1024
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / escala
+    return propio, hijos
+
+
+def run_benchmark(engine="selenium", rows=100, latency=0.0, workers=1, extract=False,
+                  headless=True, rps=None, pages_dir=None, datasets=None, tabs=1):
+    """
+    Ejecuta el scraper contra el sitio local y mide la ejecución
+    
+    Se ejecuta en una carpeta temporal para no tocar downloads/, logs/, la
+    bitácora ni las huellas de la instalación real.
+    
+    Args:
+        engine (str): "selenium" o "http"
+        rows (int): Filas de cada tabla
+        latency (float): Latencia del servidor en segundos
+        workers (int): Workers en paralelo
+        extract (bool): Modo extract del motor Selenium
+        headless (bool): Ejecutar Chrome sin ventana
+        rps (float): Tasa fija de peticiones por segundo (None = RATE_LIMIT_CONFIG)
+        pages_dir (str): Carpeta con páginas grabadas
+        datasets (list): Nombres de datasets a extraer (por defecto todos)
+        tabs (int): Pestañas de un solo Chrome (motor Selenium con un worker)
+    
+    Returns:
+        dict: Resultados del benchmark
+    """
+    seleccion = [d for d in DATASETS if not datasets or d["nombre"] in datasets]
+    cwd = os.getcwd()
+    
+    with MockSite(latency, rows, pages_dir) as site, tempfile.TemporaryDirectory(prefix="benchmark_") as work_dir:
+        os.chdir(work_dir)
+        os.makedirs("logs", exist_ok=True)
+        
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        scraper = None
+        try:
+            if engine == "http":
+                from http_scraper import HttpScraper
+                scraper = timed(HttpScraper)(base_url=site.url)
+            else:
+                from scraper import UabcScraper
+                scraper = timed(UabcScraper)(headless=headless, extract=extract, base_url=site.url)
+            arranque = time.perf_counter() - inicio
+            
+            scraper.timings = {}
+            scraper.skip_unchanged = False
+            if rps:
+                scraper.rate_limiter.rate = scraper.rate_limiter.min_rate = scraper.rate_limiter.max_rate = rps
+            
+            if engine == "http":
+                scraper.scrape_datasets(seleccion, workers)
+            else:
+                scraper.scrape_datasets(seleccion, workers, tabs)
+            archivos = scraper.catalog.count()
+        finally:
+            if scraper:
+                scraper.close()
+            total = time.perf_counter() - inicio
+            _, pico_python = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            os.chdir(cwd)
+    
+    rss_propio, rss_hijos = peak_rss_mb()
+    return {
+        "motor": engine,
+        "modo": "extract" if extract else "descarga",
+        "workers": workers,
+        "pestanas": tabs,
+        "filas": rows,
+        "latencia": latency,
+        "rps": rps,
+        "arranque_segundos": arranque,
+        "total_segundos": total,
+        "archivos": archivos,
+        "descargas_por_segundo": archivos / total if total else 0.0,
+        "pico_python_mb": pico_python / (1024 * 1024),
+        "max_rss_mb": rss_propio,
+        "max_rss_hijos_mb": rss_hijos,
+        "datasets": scraper.timings,
+        "fases": scraper.metrics.by_phase(),
+    }
+
+
+def print_report(resultado):
+    """Imprime el resultado de un benchmark"""
+    print("\n" + "="*80)
+    print(f"BENCHMARK - motor {resultado['motor']} ({resultado['modo']}), "
+          f"{resultado['workers']} worker(s), {resultado['pestanas']} pestaña(s), {resultado['filas']} filas, "
+          f"latencia {resultado['latencia']:.2f} s")
+    print("="*80)
+    
+    for nombre, medida in resultado["datasets"].items():
+        marca = "✓" if medida["exitoso"] else "✗"
+        print(f"  {marca} {nombre:<45} {medida['segundos']:8.2f} s")
+    
+    print("-"*80)
+    for fase, agregado in sorted(resultado["fases"].items(), key=lambda item: -item[1]["total"]):
+        print(f"  {fase:<20} {agregado['total']:9.2f} s en {agregado['n']} span(s)")
+    
+    print("-"*80)
+    print(f"Arranque del motor: {resultado['arranque_segundos']:.2f} s")
+    print(f"Tiempo total: {resultado['total_segundos']:.2f} s")
+    print(f"Archivos generados: {resultado['archivos']}")
+    print(f"Descargas por segundo: {resultado['descargas_por_segundo']:.2f}")
+    print(f"Memoria pico Python (tracemalloc): {resultado['pico_python_mb']:.1f} MB")
+    if resultado["max_rss_mb"] is not None:
+        print(f"RSS máximo: {resultado['max_rss_mb']:.1f} MB (hijos: {resultado['max_rss_hijos_mb']:.1f} MB)")
+    print("="*80)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark sin red del scraper de indicadores UABC")
+    parser.add_argument("--motor", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--filas", type=int, default=100, help="Filas de cada tabla sintética")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Latencia del servidor en segundos")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pestanas", type=int, default=1, help="Pestañas de un solo Chrome (con --workers 1)")
+    parser.add_argument("--extract", action="store_true", help="Modo extract del motor Selenium")
+    parser.add_argument("--con-ventana", action="store_true", help="Mostrar la ventana de Chrome")
+    parser.add_argument("--rps", type=float, help="Tasa fija de peticiones por segundo")
+    parser.add_argument("--paginas", help="Carpeta con páginas grabadas ({nombre}.html)")
+    parser.add_argument("--datasets", nargs="+", help="Datasets a extraer (por defecto todos)")
+    parser.add_argument("--json", help="Guardar el resultado en este archivo JSON")
+    args = parser.parse_args()
+    
+    resultado = run_benchmark(
+        engine=args.motor, rows=args.filas, latency=args.latencia, workers=args.workers,
+        extract=args.extract, headless=not args.con_ventana, rps=args.rps,
+        pages_dir=args.paginas, datasets=args.datasets, tabs=args.pestanas,
+    )
+    print_report(resultado)
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Catálogo SQLite de los archivos descargados
+Registra cada archivo al escribirlo para no tener que recorrer downloads/raw con glob
+"""
+
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+
+from config import CATALOG_CONFIG, DATASETS, FOLDERS
+from sqlite_store import SQLiteStore
+
+
+# {salida}_{YYYYmmdd_HHMMSS}.{ext}
+OUTPUT_NAME_RE = re.compile(r"^(?P<salida>.+)_(?P<timestamp>\d{8}_\d{6})\.(?P<ext>[A-Za-z0-9]+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    ruta TEXT PRIMARY KEY,
+    dataset TEXT,
+    salida TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    extension TEXT,
+    tamano INTEGER,
+    sha256 TEXT,
+    filas INTEGER,
+    columnas INTEGER,
+    registrado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_archivos_dataset ON archivos (dataset, timestamp);
+CREATE INDEX IF NOT EXISTS idx_archivos_salida ON archivos (salida, timestamp);
+CREATE TABLE IF NOT EXISTS validaciones (
+    ruta TEXT PRIMARY KEY,
+    tamano INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size_valid INTEGER,
+    size_msg TEXT,
+    struct_valid INTEGER,
+    struct_msg TEXT,
+    info TEXT,
+    validado TEXT
+);
+CREATE TABLE IF NOT EXISTS variantes (
+    dataset TEXT NOT NULL,
+    sufijo TEXT NOT NULL,
+    valor TEXT,
+    descubierta TEXT,
+    PRIMARY KEY (dataset, sufijo)
+);
+"""
+
+
+def parse_output_name(filename):
+    """
+    Separa el nombre de un archivo generado en salida y timestamp
+    
+    Args:
+        filename (str): Nombre o ruta del archivo
+    
+    Returns:
+        dict: {"salida", "timestamp", "ext"} o None si no sigue el formato
+    """
+    match = OUTPUT_NAME_RE.match(os.path.basename(filename))
+    return match.groupdict() if match else None
+
+
+def dataset_outputs(datasets=None, discovered=None):
+    """
+    Relaciona cada salida esperada con su dataset y filtro
+    
+    Los datasets sin "filtros" generan una salida con su nombre; los que tienen
+    la clave (aunque sea una lista vacía) generan una salida por sufijo declarado
+    o descubierto en la página.
+    
+    Args:
+        datasets (list): Datasets configurados (por defecto DATASETS)
+        discovered (dict): {dataset: [sufijos]} descubiertos (DownloadCatalog.variants())
+    
+    Returns:
+        dict: {salida: (dataset, sufijo o None)}
+    """
+    discovered = discovered or {}
+    salidas = {}
+    for dataset in datasets or DATASETS:
+        nombre = dataset["nombre"]
+        if "filtros" in dataset:
+            sufijos = [f["sufijo"] for f in dataset["filtros"]] + discovered.get(nombre, [])
+            for sufijo in sufijos:
+                salidas[sufijo] = (nombre, sufijo)
+        else:
+            salidas[nombre] = (nombre, None)
+    return salidas
+
+
+def file_sha256(filepath):
+    """Calcula el SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+class DownloadCatalog(SQLiteStore):
+    """Catálogo de archivos almacenados con consultas indexadas"""
+    
+    def __init__(self, path=None):
+        """
+        Abre (o crea) el catálogo
+        
+        Args:
+            path (str): Ruta de la base SQLite (por defecto CATALOG_CONFIG["file"])
+        """
+        super().__init__(path or CATALOG_CONFIG["file"], SCHEMA)
+    
+    def register(self, filepath, dataset=None, filas=None, columnas=None):
+        """
+        Registra (o actualiza) un archivo recién escrito
+        
+        Args:
+            filepath (str): Ruta del archivo
+            dataset (str): Nombre del dataset al que pertenece
+            filas (int): Número de filas de datos, si se conoce
+            columnas (int): Número de columnas, si se conoce
+        """
+        partes = parse_output_name(filepath) or {
+            "salida": os.path.splitext(os.path.basename(filepath))[0],
+            "timestamp": datetime.fromtimestamp(os.path.getmtime(filepath)).strftime("%Y%m%d_%H%M%S"),
+            "ext": os.path.splitext(filepath)[1].lstrip("."),
+        }
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO archivos
+                    (ruta, dataset, salida, timestamp, extension, tamano, sha256, filas, columnas, registrado)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    os.path.normpath(filepath), dataset, partes["salida"], partes["timestamp"],
+                    partes["ext"], os.path.getsize(filepath), file_sha256(filepath),
+                    filas, columnas, datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+    
+    def update_structure(self, filepath, filas, columnas):
+        """
+        Guarda filas y columnas de un archivo ya registrado (por ejemplo tras validarlo)
+        
+        Args:
+            filepath (str): Ruta del archivo
+            filas (int): Número de filas de datos
+            columnas (int): Número de columnas
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE archivos SET filas = ?, columnas = ? WHERE ruta = ?",
+                (filas, columnas, os.path.normpath(filepath)),
+            )
+    
+    def remove(self, filepath):
+        """Elimina un archivo del catálogo"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM archivos WHERE ruta = ?", (os.path.normpath(filepath),))
+            self._conn.execute("DELETE FROM validaciones WHERE ruta = ?", (os.path.normpath(filepath),))
+    
+    def files(self, folder=None, pattern=".xls"):
+        """
+        Lista los archivos registrados
+        
+        Args:
+            folder (str): Carpeta a la que deben pertenecer (por defecto FOLDERS["raw"])
+            pattern (str): Texto que debe contener la extensión
+        
+        Returns:
+            list: Rutas ordenadas por salida y timestamp
+        """
+        carpeta = os.path.normpath(folder or FOLDERS["raw"])
+        filas = self._query(
+            "SELECT ruta FROM archivos WHERE ruta LIKE ? AND extension LIKE ? ORDER BY salida, timestamp",
+            (os.path.join(carpeta, "%"), f"%{pattern.lstrip('.')}%"),
+        )
+        return [r["ruta"] for r in filas]
+    
+    def latest(self, dataset=None, folder=None, extension=None):
+        """
+        Obtiene el archivo más reciente (de un dataset o de todo el catálogo)
+        
+        El catálogo también registra las salidas del modo extract (CSV/Parquet en
+        FOLDERS["processed"]); quien espera una descarga cruda debe pasar la carpeta.
+        
+        Args:
+            dataset (str): Nombre del dataset (opcional)
+            folder (str): Solo archivos de esta carpeta (opcional, p. ej. FOLDERS["raw"])
+            extension (str): Solo archivos con esta extensión (opcional, p. ej. ".xls")
+        
+        Returns:
+            dict: Registro del archivo o None
+        """
+        condiciones = []
+        params = []
+        if dataset:
+            condiciones.append("dataset = ?")
+            params.append(dataset)
+        if folder:
+            condiciones.append("ruta LIKE ?")
+            params.append(os.path.join(os.path.normpath(folder), "%"))
+        if extension:
+            condiciones.append("extension = ?")
+            params.append(extension.lstrip("."))
+        
+        where = f"WHERE {' AND '.join(condiciones)} " if condiciones else ""
+        filas = self._query(f"SELECT * FROM archivos {where}ORDER BY timestamp DESC LIMIT 1", params)
+        return filas[0] if filas else None
+    
+    def latest_per_output(self):
+        """
+        Obtiene el archivo más reciente de cada salida (dataset o variante de filtro)
+        
+        Returns:
+            dict: {salida: registro}
+        """
+        filas = self._query(
+            """
+            SELECT a.* FROM archivos a
+            JOIN (SELECT salida, MAX(timestamp) AS ts FROM archivos GROUP BY salida) m
+              ON a.salida = m.salida AND a.timestamp = m.ts
+            """
+        )
+        return {r["salida"]: r for r in filas}
+    
+    def latest_per_dataset(self):
+        """
+        Obtiene el archivo más reciente de cada dataset
+        
+        Returns:
+            dict: {dataset: registro}
+        """
+        filas = self._query(
+            """
+            SELECT a.* FROM archivos a
+            JOIN (SELECT dataset, MAX(timestamp) AS ts FROM archivos
+                  WHERE dataset IS NOT NULL GROUP BY dataset) m
+              ON a.dataset = m.dataset AND a.timestamp = m.ts
+            """
+        )
+        return {r["dataset"]: r for r in filas}
+    
+    def cached_validation(self, filepath, tamano, mtime_ns):
+        """
+        Obtiene la validación guardada de un archivo si no cambió desde entonces
+        
+        Args:
+            filepath (str): Ruta del archivo
+            tamano (int): Tamaño actual en bytes
+            mtime_ns (int): Fecha de modificación actual (ns)
+        
+        Returns:
+            dict: Resultado de la validación o None si no hay uno vigente
+        """
+        filas = self._query(
+            "SELECT * FROM validaciones WHERE ruta = ? AND tamano = ? AND mtime_ns = ?",
+            (os.path.normpath(filepath), tamano, mtime_ns),
+        )
+        if not filas:
+            return None
+        
+        r = filas[0]
+        return {
+            "ruta": filepath,
+            "size_valid": bool(r["size_valid"]),
+            "size_msg": r["size_msg"],
+            "struct_valid": bool(r["struct_valid"]),
+            "struct_msg": r["struct_msg"],
+            "info": json.loads(r["info"]),
+        }
+    
+    def save_validation(self, result, tamano, mtime_ns):
+        """
+        Guarda el resultado de validar un archivo
+        
+        Args:
+            result (dict): Resultado de validator.validate_file()
+            tamano (int): Tamaño del archivo al validarlo
+            mtime_ns (int): Fecha de modificación al validarlo (ns)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO validaciones
+                    (ruta, tamano, mtime_ns, size_valid, size_msg, struct_valid, struct_msg, info, validado)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    os.path.normpath(result["ruta"]), tamano, mtime_ns,
+                    result["size_valid"], result["size_msg"], result["struct_valid"], result["struct_msg"],
+                    json.dumps(result["info"], ensure_ascii=False, default=str),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+    
+    def prune_validations(self):
+        """
+        Elimina las validaciones de archivos que ya no están en el catálogo
+        
+        Returns:
+            int: Registros eliminados
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM validaciones WHERE ruta NOT IN (SELECT ruta FROM archivos)"
+            )
+            return cursor.rowcount
+    
+    def record_variants(self, dataset, variantes):
+        """
+        Guarda las variantes de filtro descubiertas en la página de un dataset
+        
+        Args:
+            dataset (str): Nombre del dataset
+            variantes (list): Variantes [{"valor", "sufijo"}]
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO variantes (dataset, sufijo, valor, descubierta) VALUES (?, ?, ?, ?)",
+                [
+                    (dataset, v["sufijo"], v["valor"], datetime.now().isoformat(timespec="seconds"))
+                    for v in variantes
+                ],
+            )
+    
+    def variants(self):
+        """
+        Variantes de filtro descubiertas de cada dataset
+        
+        Returns:
+            dict: {dataset: [sufijos]} en el orden en que se descubrieron
+        """
+        variantes = {}
+        for r in self._query("SELECT dataset, sufijo FROM variantes ORDER BY descubierta, sufijo"):
+            variantes.setdefault(r["dataset"], []).append(r["sufijo"])
+        return variantes
+    
+    def count(self):
+        """Número de archivos registrados"""
+        return self._query("SELECT COUNT(*) AS n FROM archivos")[0]["n"]
+    
+    def sync_folder(self, folder=None, full=False):
+        """
+        Registra los archivos del disco que aún no están en el catálogo y
+        elimina los registros de archivos que ya no existen
+        
+        Solo compara nombres (un os.scandir contra el catálogo) y calcula el
+        hash de los archivos nuevos, así que es barato hacerlo en cada ejecución.
+        
+        Args:
+            folder (str): Carpeta a sincronizar (por defecto FOLDERS["raw"])
+            full (bool): Volver a registrar también los archivos ya catalogados
+                (recalcula tamaño y hash)
+        
+        Returns:
+            tuple: (agregados, eliminados)
+        """
+        carpeta = folder or FOLDERS["raw"]
+        salidas = dataset_outputs(discovered=self.variants())
+        registrados = set(self.files(carpeta, pattern=""))
+        
+        en_disco = set()
+        agregados = 0
+        with os.scandir(carpeta) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                ruta = os.path.normpath(entry.path)
+                en_disco.add(ruta)
+                if ruta in registrados and not full:
+                    continue
+                partes = parse_output_name(entry.name)
+                dataset = salidas[partes["salida"]][0] if partes and partes["salida"] in salidas else None
+                self.register(ruta, dataset=dataset)
+                agregados += 1
+        
+        eliminados = registrados - en_disco
+        for ruta in eliminados:
+            self.remove(ruta)
+        
+        return agregados, len(eliminados)
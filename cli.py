@@ -0,0 +1,206 @@
+"""
+Línea de comandos no interactiva del scraper de indicadores UABC
+
+    python cli.py scrape [--prioridad N | --datasets A B ...] [--motor selenium|http] [--workers N] [-v | -q]
+    python cli.py validate [--cached] [--workers N]
+    python cli.py process [--forzar]
+    python cli.py status
+
+Cada subcomando importa solo lo que necesita: Selenium, requests y pandas se
+cargan únicamente al extraer o al validar archivos que los requieren
+"""
+
+import sys
+import json
+import argparse
+
+from config import DATASETS
+
+
+def cmd_scrape(args):
+    """Extrae datasets; código 0 sin fallos, 1 con fallos, 2 con error"""
+    from daemon import select_datasets, send_request
+    
+    desconocidos = set(args.datasets or []) - {d["nombre"] for d in DATASETS}
+    if desconocidos:
+        print(f"❌ Datasets desconocidos: {', '.join(sorted(desconocidos))}")
+        return 2
+    
+    datasets = select_datasets(args.datasets, args.prioridad)
+    if not datasets:
+        print("❌ No hay datasets que coincidan")
+        return 2
+    
+    # Con --daemon el trabajo lo ejecuta el navegador ya abierto del daemon
+    if args.daemon:
+        try:
+            respuesta = send_request({
+                "accion": "scrape",
+                "datasets": [d["nombre"] for d in datasets],
+                "workers": args.workers,
+                "tabs": args.pestanas,
+                "resume": args.resume,
+            })
+        except OSError as e:
+            print(f"❌ No se pudo contactar al daemon: {e}")
+            return 2
+        print(json.dumps(respuesta, ensure_ascii=False, indent=2))
+        if respuesta.get("error"):
+            return 2
+        return 0 if respuesta.get("ok") else 1
+    
+    if args.verbose or args.quiet:
+        from async_logging import start_logging
+        start_logging(console_level="DEBUG" if args.verbose else "WARNING")
+    
+    scraper = None
+    try:
+        if args.motor == "http":
+            from http_scraper import HttpScraper
+            scraper = HttpScraper(resume=args.resume)
+        else:
+            from scraper import UabcScraper
+            scraper = UabcScraper(headless=not args.con_ventana, extract=args.extract, resume=args.resume)
+        
+        scraper.stats["total"] = len(datasets)
+        scraper.log_message(f"\nIniciando extracción de {len(datasets)} datasets...")
+        if args.motor == "http":
+            scraper.scrape_datasets(datasets, args.workers)
+        else:
+            scraper.scrape_datasets(datasets, args.workers, args.pestanas)
+        scraper.print_summary()
+        
+        return 0 if scraper.stats["fallidos"] == 0 else 1
+    
+    except KeyboardInterrupt:
+        print("\n\nProceso interrumpido por el usuario (reanudar con --resume)")
+        return 130
+    except Exception as e:
+        print(f"\n❌ Error fatal: {e}")
+        return 2
+    finally:
+        if scraper:
+            scraper.close()
+
+
+def cmd_validate(args):
+    """Valida los archivos descargados; código 0 si todo es válido y está completo"""
+    from validator import FileValidator
+    
+    validator = FileValidator(sync=args.sync)
+    resumen = validator.generate_report(workers=args.workers, cached_only=args.cached)
+    
+    if not resumen:
+        return 1
+    problemas = resumen["invalidos"] + resumen["faltantes"] + resumen["desactualizados"]
+    return 0 if problemas == 0 else 1
+
+
+def cmd_process(args):
+    """Normaliza las descargas a Parquet en formato largo; código 1 si algún archivo falló"""
+    from procesamiento import process_latest, print_results
+    
+    resultados = process_latest(force=args.forzar)
+    print_results(resultados)
+    return 1 if any(r["estado"] == "error" for r in resultados) else 0
+
+
+def cmd_status(args):
+    """Muestra la última ejecución, el catálogo, la cobertura y el daemon sin abrir el navegador"""
+    from journal import RunJournal
+    from validator import FileValidator
+    from daemon import send_request
+    
+    print("\n" + "="*80)
+    print("ESTADO - INDICADORES UABC")
+    print("="*80)
+    
+    # Última ejecución según la bitácora (último registro de cada elemento)
+    registros = RunJournal().read_records()
+    if registros:
+        run_id = registros[-1]["run"]
+        estados = {}
+        for r in registros:
+            if r["run"] == run_id:
+                estados[r["item"]] = r["estado"]
+        conteo = {}
+        for estado in estados.values():
+            conteo[estado] = conteo.get(estado, 0) + 1
+        print(f"\nÚltima ejecución: {run_id} ({registros[-1]['fecha']})")
+        print("  " + ", ".join(f"{estado}: {n}" for estado, n in sorted(conteo.items())))
+    else:
+        print("\nSin ejecuciones registradas")
+    
+    validator = FileValidator()
+    try:
+        print(f"\nArchivos en el catálogo: {validator.catalog.count()}")
+        
+        coverage = validator.check_dataset_coverage()
+        print(f"Cobertura: {coverage['encontrados']}/{coverage['total_esperados']} "
+              f"({coverage['cobertura_pct']:.1f}%), desactualizados: {coverage['desactualizados']}")
+        for dataset in coverage["lista_faltantes"]:
+            print(f"  ✗ {dataset}")
+        for dataset in coverage["lista_desactualizados"]:
+            estado = coverage["detalle"][dataset]["estado"]
+            print(f"  ⚠️  {dataset}: {estado['antiguedad_dias']:.1f} días")
+    finally:
+        validator.catalog.close()
+    
+    try:
+        estado = send_request({"accion": "estado"}, timeout=0.5)
+        print(f"\nDaemon: activo ({estado.get('trabajos', 0)} trabajos, "
+              f"{'ocupado' if estado.get('ocupado') else 'libre'})")
+    except (OSError, ValueError):
+        print("\nDaemon: no activo")
+    
+    print("="*80)
+    return 0
+
+
+def build_parser():
+    """Construye el parser de argumentos"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Scraper de indicadores UABC (sin menú interactivo)"
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+    
+    scrape = sub.add_parser("scrape", help="Extraer datasets")
+    seleccion = scrape.add_mutually_exclusive_group()
+    seleccion.add_argument("--datasets", nargs="+", metavar="NOMBRE", help="Datasets a extraer")
+    seleccion.add_argument("--prioridad", type=int, choices=[1, 2, 3], help="Solo datasets de esta prioridad")
+    scrape.add_argument("--motor", choices=["selenium", "http"], default="selenium")
+    scrape.add_argument("--workers", type=int, help="Workers en paralelo")
+    scrape.add_argument("--pestanas", type=int, help="Pestañas de un solo Chrome (con un worker)")
+    scrape.add_argument("--con-ventana", action="store_true", help="Mostrar la ventana de Chrome")
+    scrape.add_argument("--extract", action="store_true", help="Leer la tabla en lugar de descargar el Excel")
+    scrape.add_argument("--resume", action="store_true", help="Reanudar la última ejecución")
+    scrape.add_argument("--daemon", action="store_true", help="Enviar el trabajo al daemon")
+    verbosidad = scrape.add_mutually_exclusive_group()
+    verbosidad.add_argument("-v", "--verbose", action="store_true", help="Mostrar cada paso en consola")
+    verbosidad.add_argument("-q", "--quiet", action="store_true", help="Mostrar solo advertencias y errores")
+    scrape.set_defaults(func=cmd_scrape)
+    
+    validate = sub.add_parser("validate", help="Validar archivos descargados")
+    validate.add_argument("--cached", action="store_true", help="Usar solo validaciones guardadas")
+    validate.add_argument("--workers", type=int, help="Procesos para validar")
+    validate.add_argument("--sync", action="store_true", help="Volver a registrar todos los archivos de downloads/raw (tamaño y hash)")
+    validate.set_defaults(func=cmd_validate)
+    
+    process = sub.add_parser("process", help="Normalizar las descargas a Parquet en formato largo")
+    process.add_argument("--forzar", action="store_true", help="Regenerar aunque el Parquet esté al día")
+    process.set_defaults(func=cmd_process)
+    
+    status = sub.add_parser("status", help="Estado de la última ejecución y de las descargas")
+    status.set_defaults(func=cmd_status)
+    
+    return parser
+
+
+def main(argv=None):
+    """Función principal"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,9 @@ Configuración de URLs y datasets para el scraper de indicadores UABC
 BASE_URL = "https://indicadores.uabc.mx"
 
 # Configuración de datasets a extraer
+# "filtros" (opcional): opciones de cbNivel a exportar, cada una en su propio archivo {sufijo}_{timestamp}.
+# Con FILTER_CONFIG["discover"] también se exportan las opciones nuevas que aparezcan en la página
+# ("filtros": [] exporta todas las opciones descubiertas; el catálogo las guarda para la cobertura)
 DATASETS = [
     {
         "nombre": "Alumnos_Licenciatura_Historico",
@@ -35,7 +38,11 @@ DATASETS = [
         "nombre": "Programas_Licenciatura",
         "url": "/indicadores/programasEducativosLicenciatura",
         "descripcion": "Programas educativos de licenciatura",
-        "prioridad": 2
+        "prioridad": 2,
+        "filtros": [
+            {"valor": "Unidad académica", "sufijo": "Programas_Lic_UnidadAcademica"},
+            {"valor": "Área de conocimiento", "sufijo": "Programas_Lic_AreaConocimiento"}
+        ]
     },
     {
         "nombre": "Programas_Licenciatura_Acred_Internacional",
@@ -65,7 +72,10 @@ DATASETS = [
         "nombre": "Relacion_Alumnos_Profesor",
         "url": "/indicadores/PersonalAcademico/relacionAlumno_pa",
         "descripcion": "Relación alumnos por profesor",
-        "prioridad": 1
+        "prioridad": 1,
+        "filtros": [
+            {"valor": "Unidad académica", "sufijo": "Relacion_AlumnosProfesor_UnidadAcademica"}
+        ]
     },
     {
         "nombre": "Personal_SNI_Historico",
@@ -77,7 +87,11 @@ DATASETS = [
         "nombre": "Cuerpos_Academicos",
         "url": "/indicadores/cuerposAcademicos/",
         "descripcion": "Cuerpos académicos",
-        "prioridad": 1
+        "prioridad": 1,
+        "filtros": [
+            {"valor": "Unidad académica", "sufijo": "CuerposAcademicos_UnidadAcademica"},
+            {"valor": "Área de conocimiento", "sufijo": "CuerposAcademicos_AreaConocimiento"}
+        ]
     }
 ]
 
@@ -86,20 +100,146 @@ SELENIUM_CONFIG = {
     "implicit_wait": 10,  # Segundos
     "page_load_timeout": 30,  # Segundos
     "download_timeout": 60,  # Segundos para esperar descarga
-    "delay_between_requests": 3,  # Segundos entre cada petición
+}
+
+# Limitador de peticiones al servidor (token bucket adaptativo, compartido por los workers)
+RATE_LIMIT_CONFIG = {
+    "requests_per_second": 0.5,  # Tasa inicial
+    "min_requests_per_second": 0.1,  # Tasa mínima tras retrocesos
+    "max_requests_per_second": 2,  # Tasa máxima cuando el servidor responde bien
+    "burst": 2,  # Peticiones que pueden salir seguidas sin esperar
+    "target_latency": 5,  # Segundos de respuesta por encima de los cuales se reduce la tasa
+    "backoff_factor": 0.5,  # Factor de reducción ante errores o lentitud
+    "increase_step": 0.1,  # Incremento de la tasa tras cada respuesta rápida
+}
+
+# Esperas por señales reales de la página (reemplazan los time.sleep fijos)
+READINESS_CONFIG = {
+    "timeout": 15,  # Segundos máximos de espera antes de continuar de todos modos
+    "mutation_timeout": 5,  # Segundos máximos esperando que un filtro modifique la tabla
+    "stable_for": 0.3,  # Segundos que la tabla debe permanecer sin cambios
+    "poll_interval": 0.05,  # Segundos entre consultas al navegador
+}
+
+# Extracción directa de la tabla (modo extract): formato de salida en FOLDERS["processed"]
+EXTRACTION_CONFIG = {
+    "format": "csv",  # "csv" o "parquet" (requiere pyarrow)
+}
+
+# Detección de cambios: omite la exportación si la tabla no cambió
+CHANGE_DETECTION = {
+    "enabled": True,
+    "state_file": "downloads/fingerprints.json",  # Última huella exitosa por salida y modo (con los archivos que generó)
+}
+
+# Reintentos por dataset con backoff exponencial
+RETRY_CONFIG = {
+    "max_attempts": 3,  # Intentos por dataset
+    "backoff_base": 2,  # Segundos de espera tras el primer fallo (se duplica en cada intento)
+    "backoff_max": 60,  # Espera máxima entre intentos
+}
+
+# Bitácora de ejecución para reanudar corridas interrumpidas
+JOURNAL_CONFIG = {
+    "file": "logs/journal.jsonl",
+}
+
+# Catálogo SQLite de archivos almacenados
+CATALOG_CONFIG = {
+    "file": "downloads/catalog.sqlite",
+}
+
+# Almacén histórico consolidado (python almacen.py)
+WAREHOUSE_CONFIG = {
+    "file": "downloads/almacen.sqlite",
+    "update_after_scrape": False,  # Cargar las descargas nuevas al terminar cada ejecución (requiere pandas y pyarrow, ~1 s)
+}
+
+# Configuración de extracción en paralelo
+PARALLEL_CONFIG = {
+    "workers": 1,  # Sesiones de Chrome simultáneas (1 = modo secuencial)
+    "max_workers_per_host": 3,  # Límite de sesiones concurrentes contra el mismo servidor
+    "tabs": 1,  # Pestañas de un solo Chrome que se intercalan (con workers = 1); más ligero que varios navegadores
+}
+
+# Métricas de tiempo por fase (arranque, carga, espera de tabla, filtros, descarga)
+METRICS_CONFIG = {
+    "enabled": True,
+    "json_file": "logs/metricas_{run}.json",  # Un archivo por ejecución
+    "prometheus_file": "logs/uabc_scraper.prom",  # Para el textfile collector de node_exporter
+    "prometheus_prefix": "uabc_scraper",
+}
+
+# Historial de ejecuciones y detección de regresiones (python history.py)
+HISTORY_CONFIG = {
+    "file": "logs/historial.sqlite",
+    "baseline_runs": 5,  # Ejecuciones anteriores cuya mediana forma la línea base
+    "latency_threshold": 0.5,  # Marcar si la duración sube más de 50 %
+    "size_threshold": 0.2,  # Marcar si el tamaño cambia más de 20 % en cualquier sentido
+    "min_seconds_delta": 2.0,  # Ignorar aumentos menores a estos segundos
+}
+
+# Datasets con filtros (cbNivel)
+FILTER_CONFIG = {
+    "discover": True,  # Agregar las opciones de cbNivel que no estén declaradas en DATASETS
+    "exclude": [],  # Textos de opciones que nunca se exportan (p. ej. "Seleccione...")
+    "tabs": 2,  # Pestañas simultáneas para las variantes de un dataset (1 = una tras otra)
+}
+
+# Planificador de actualizaciones (python planificador.py)
+# Un dataset puede fijar su propio intervalo con "intervalo_horas"
+SCHEDULER_CONFIG = {
+    "interval_hours": {1: 24, 2: 168, 3: 720},  # Intervalo de actualización por prioridad
+    "default_interval_hours": 168,  # Datasets sin prioridad reconocida
+    "retry_minutes": 60,  # Espera antes de reintentar un dataset que falló
+    "poll_seconds": 300,  # Espera máxima entre revisiones de la cola
+    "max_batch": 0,  # Datasets por ejecución (0 = todos los vencidos)
+}
+
+# Modo daemon (python daemon.py iniciar): Chrome abierto entre trabajos
+DAEMON_CONFIG = {
+    "host": "127.0.0.1",  # Solo conexiones locales
+    "port": 8765,
+    "max_jobs": 20,  # Reiniciar Chrome después de estos trabajos
+    "max_memory_mb": 1500,  # Reiniciar Chrome si sus procesos superan esta memoria
+}
+
+# Configuración del motor HTTP (sin navegador)
+HTTP_CONFIG = {
+    "timeout": 30,  # Segundos por petición
+    "retries": 2,  # Reintentos ante errores 5xx o de conexión
+    "pool_maxsize": 4,  # Conexiones keep-alive reutilizables por sesión
+    "user_agent": "Mozilla/5.0 (compatible; UabcScraper/1.0)",
+}
+
+# Logging (un hilo aparte escribe en consola y archivos; los workers no esperan E/S)
+LOGGING_CONFIG = {
+    "console_level": "INFO",  # "DEBUG" muestra cada paso, "WARNING" solo problemas
+    "file_level": "INFO",  # Nivel del .log y del .jsonl
+    "json": True,  # Además del .log, un .jsonl con dataset, fase, segundos y resultado por registro
 }
 
 # Selectores HTML
 SELECTORS = {
     "tabla": "tblData",  # ID de la tabla
     "boton_excel": "button[onclick*='exportTableToExcel']",  # Selector CSS del botón
+    "filtro": "cbNivel",  # ID del select de filtros
     "link_regresar": "a[href='/indicadores/Ind_Publicos/']"
 }
 
+# Validación de archivos descargados
+VALIDATION_CONFIG = {
+    "workers": 0,  # Procesos para validar en paralelo (0 = todos los núcleos, 1 = secuencial)
+    "use_cache": True,  # Reutilizar validaciones de archivos sin cambios (tamaño y fecha de modificación)
+    "max_age_days": 7,  # Antigüedad máxima de la última descarga antes de considerarla desactualizada
+}
+
 # Configuración de carpetas
 FOLDERS = {
     "downloads": "downloads",
     "raw": "downloads/raw",
     "processed": "downloads/processed",
+    "tidy": "downloads/processed/largo",  # Parquet en formato largo (python procesamiento.py)
+    "staging": "downloads/staging",
     "logs": "logs"
 }
@@ -0,0 +1,353 @@
+"""
+Modo daemon: mantiene un scraper con Chrome abierto y recibe trabajos por un socket local
+Las ejecuciones programadas empiezan a extraer de inmediato en lugar de pagar
+la importación de Selenium y el arranque del navegador en cada invocación
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+import threading
+import socketserver
+from datetime import datetime
+
+from config import DATASETS, DAEMON_CONFIG
+
+
+def process_tree_rss_mb(pid):
+    """
+    Memoria residente de un proceso y todos sus descendientes (Linux, vía /proc)
+    
+    Args:
+        pid (int): Proceso raíz (chromedriver)
+    
+    Returns:
+        float: MB o None si /proc no está disponible
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    
+    hijos = {}
+    rss = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat") as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                campos = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{entrada}/statm") as f:
+                paginas = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        hijos.setdefault(int(campos[1]), []).append(int(entrada))
+        rss[int(entrada)] = paginas * os.sysconf("SC_PAGE_SIZE")
+    
+    total = 0
+    pendientes = [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        total += rss.get(actual, 0)
+        pendientes.extend(hijos.get(actual, []))
+    return total / (1024 * 1024)
+
+
+def select_datasets(nombres=None, prioridad=None):
+    """
+    Filtra config.DATASETS por nombre y/o prioridad
+    
+    Args:
+        nombres (list): Nombres de datasets (None = todos)
+        prioridad (int): Nivel de prioridad (None = todas)
+    
+    Returns:
+        list: Datasets seleccionados, en el orden de config
+    """
+    return [
+        d for d in DATASETS
+        if (not nombres or d["nombre"] in nombres)
+        and (prioridad is None or d.get("prioridad") == prioridad)
+    ]
+
+
+class ScraperDaemon:
+    """Scraper Selenium residente con reciclado del navegador"""
+    
+    def __init__(self, headless=True, extract=False, max_jobs=None, max_memory_mb=None):
+        """
+        Arranca el scraper y su navegador
+        
+        Args:
+            headless (bool): Ejecutar Chrome sin ventana
+            extract (bool): Modo extract del scraper
+            max_jobs (int): Trabajos antes de reiniciar Chrome (por defecto DAEMON_CONFIG["max_jobs"])
+            max_memory_mb (float): Memoria de Chrome que fuerza el reinicio
+                (por defecto DAEMON_CONFIG["max_memory_mb"])
+        """
+        from scraper import UabcScraper
+        
+        self.scraper = UabcScraper(headless=headless, extract=extract)
+        self.max_jobs = max_jobs or DAEMON_CONFIG["max_jobs"]
+        self.max_memory_mb = max_memory_mb or DAEMON_CONFIG["max_memory_mb"]
+        self.jobs_since_restart = 0
+        self.jobs_total = 0
+        self.started = datetime.now()
+        self._job_lock = threading.Lock()
+    
+    def driver_memory_mb(self):
+        """Memoria de chromedriver y los procesos de Chrome que lanzó"""
+        try:
+            return process_tree_rss_mb(self.scraper.driver.service.process.pid)
+        except AttributeError:
+            return None
+    
+    def is_healthy(self):
+        """Comprueba que el navegador siga respondiendo"""
+        try:
+            return self.scraper.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+    
+    def restart_driver(self, motivo):
+        """
+        Cierra Chrome y abre uno nuevo conservando el resto del scraper
+        
+        Args:
+            motivo (str): Razón del reinicio (para el log)
+        """
+        self.scraper.log_message(f"Reiniciando navegador: {motivo}", "WARNING")
+        try:
+            self.scraper.driver.quit()
+        except Exception:
+            pass
+        self.scraper.driver = self.scraper.setup_driver(self.scraper.headless, self.scraper.download_folder)
+        self.jobs_since_restart = 0
+    
+    def ensure_driver(self):
+        """Reinicia el navegador si no responde, si superó los trabajos o la memoria permitidos"""
+        if not self.is_healthy():
+            self.restart_driver("el navegador no responde")
+            return
+        
+        if self.jobs_since_restart >= self.max_jobs:
+            self.restart_driver(f"{self.jobs_since_restart} trabajos desde el último reinicio")
+            return
+        
+        memoria = self.driver_memory_mb()
+        if memoria is not None and memoria > self.max_memory_mb:
+            self.restart_driver(f"memoria de Chrome {memoria:.0f} MB > {self.max_memory_mb} MB")
+    
+    def run_job(self, nombres=None, prioridad=None, workers=None, tabs=None, resume=False):
+        """
+        Ejecuta un trabajo de extracción con el navegador ya abierto
+        
+        Los trabajos se ejecutan de uno en uno.
+        
+        Args:
+            nombres (list): Datasets a extraer (None = todos)
+            prioridad (int): Solo datasets de esta prioridad
+            workers (int): Workers en paralelo
+            tabs (int): Pestañas del navegador
+            resume (bool): Reanudar la última ejecución
+        
+        Returns:
+            dict: Resultado del trabajo
+        """
+        datasets = select_datasets(nombres, prioridad)
+        if not datasets:
+            return {"ok": False, "error": "No hay datasets que coincidan"}
+        
+        with self._job_lock:
+            self.ensure_driver()
+            
+            scraper = self.scraper
+            scraper.reset_run(resume, total=len(datasets))
+            scraper.scrape_datasets(datasets, workers, tabs)
+            scraper.print_summary()
+            
+            self.jobs_since_restart += 1
+            self.jobs_total += 1
+            
+            return {
+                "ok": scraper.stats["fallidos"] == 0,
+                "run": scraper.journal.run_id,
+                "stats": {k: scraper.stats[k] for k in ("total", "exitosos", "fallidos", "omitidos", "no_soportados", "reanudados")},
+                "segundos": (datetime.now() - scraper.stats["inicio"]).total_seconds(),
+            }
+    
+    def status(self):
+        """Estado del daemon"""
+        memoria = self.driver_memory_mb()
+        
+        # La sesión de WebDriver no admite comandos de dos hilos: solo se revisa
+        # si se obtiene el lock, sin quedar entre la comprobación y el uso
+        navegador_responde = None
+        ocupado = not self._job_lock.acquire(blocking=False)
+        if not ocupado:
+            try:
+                navegador_responde = self.is_healthy()
+            finally:
+                self._job_lock.release()
+        
+        return {
+            "ok": True,
+            "activo_desde": self.started.isoformat(timespec="seconds"),
+            "trabajos": self.jobs_total,
+            "trabajos_desde_reinicio": self.jobs_since_restart,
+            "ocupado": ocupado,
+            "navegador_responde": navegador_responde,
+            "memoria_chrome_mb": round(memoria, 1) if memoria is not None else None,
+        }
+    
+    def close(self):
+        """Cierra el navegador y el scraper"""
+        self.scraper.close()
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Una petición JSON por línea y una respuesta JSON por línea"""
+    
+    def handle(self):
+        linea = self.rfile.readline()
+        try:
+            peticion = json.loads(linea)
+            respuesta = self.server.dispatch(peticion)
+        except Exception as e:
+            respuesta = {"ok": False, "error": str(e)}
+        self.wfile.write((json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    """Servidor local que reparte las peticiones al daemon"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, address, scraper_daemon):
+        super().__init__(address, DaemonRequestHandler)
+        self.scraper_daemon = scraper_daemon
+    
+    def dispatch(self, peticion):
+        """
+        Atiende una petición
+        
+        Args:
+            peticion (dict): {"accion": "scrape" | "estado" | "detener", ...}
+        
+        Returns:
+            dict: Respuesta
+        """
+        accion = peticion.get("accion")
+        
+        if accion == "scrape":
+            return self.scraper_daemon.run_job(
+                nombres=peticion.get("datasets"),
+                prioridad=peticion.get("prioridad"),
+                workers=peticion.get("workers"),
+                tabs=peticion.get("tabs"),
+                resume=peticion.get("resume", False),
+            )
+        if accion == "estado":
+            return self.scraper_daemon.status()
+        if accion == "detener":
+            # shutdown() espera al bucle del servidor: se llama desde otro hilo
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        
+        return {"ok": False, "error": f"Acción desconocida: {accion}"}
+
+
+def serve(headless=True, extract=False, host=None, port=None):
+    """
+    Arranca el daemon y atiende peticiones hasta recibir "detener" o Ctrl+C
+    
+    Args:
+        headless (bool): Ejecutar Chrome sin ventana
+        extract (bool): Modo extract del scraper
+        host (str): Dirección de escucha (por defecto DAEMON_CONFIG["host"])
+        port (int): Puerto (por defecto DAEMON_CONFIG["port"])
+    """
+    daemon = ScraperDaemon(headless=headless, extract=extract)
+    address = (host or DAEMON_CONFIG["host"], port or DAEMON_CONFIG["port"])
+    
+    try:
+        with DaemonServer(address, daemon) as server:
+            daemon.scraper.log_message(f"Daemon escuchando en {address[0]}:{address[1]}")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+def send_request(peticion, host=None, port=None, timeout=None):
+    """
+    Envía una petición al daemon y espera la respuesta
+    
+    Args:
+        peticion (dict): Petición
+        host (str): Dirección del daemon
+        port (int): Puerto del daemon
+        timeout (float): Segundos máximos de espera (None = sin límite)
+    
+    Returns:
+        dict: Respuesta del daemon
+    """
+    address = (host or DAEMON_CONFIG["host"], port or DAEMON_CONFIG["port"])
+    with socket.create_connection(address, timeout=timeout) as conexion:
+        conexion.sendall((json.dumps(peticion) + "\n").encode("utf-8"))
+        with conexion.makefile("r", encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Daemon del scraper de indicadores UABC")
+    parser.add_argument("--host", help="Dirección del daemon")
+    parser.add_argument("--port", type=int, help="Puerto del daemon")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    
+    iniciar = sub.add_parser("iniciar", help="Arrancar el daemon con Chrome abierto")
+    iniciar.add_argument("--con-ventana", action="store_true", help="Mostrar la ventana de Chrome")
+    iniciar.add_argument("--extract", action="store_true", help="Modo extract")
+    
+    scrape = sub.add_parser("scrape", help="Enviar un trabajo de extracción")
+    scrape.add_argument("--datasets", nargs="+", help="Datasets a extraer (por defecto todos)")
+    scrape.add_argument("--prioridad", type=int, help="Solo datasets de esta prioridad")
+    scrape.add_argument("--workers", type=int)
+    scrape.add_argument("--pestanas", type=int)
+    scrape.add_argument("--resume", action="store_true")
+    
+    sub.add_parser("estado", help="Consultar el estado del daemon")
+    sub.add_parser("detener", help="Detener el daemon")
+    
+    args = parser.parse_args()
+    
+    if args.comando == "iniciar":
+        serve(headless=not args.con_ventana, extract=args.extract, host=args.host, port=args.port)
+        return 0
+    
+    peticion = {"accion": args.comando}
+    if args.comando == "scrape":
+        peticion.update({
+            "datasets": args.datasets,
+            "prioridad": args.prioridad,
+            "workers": args.workers,
+            "tabs": args.pestanas,
+            "resume": args.resume,
+        })
+    
+    try:
+        respuesta = send_request(peticion, args.host, args.port)
+    except OSError as e:
+        print(f"❌ No se pudo contactar al daemon: {e}")
+        return 2
+    
+    print(json.dumps(respuesta, ensure_ascii=False, indent=2))
+    return 0 if respuesta.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
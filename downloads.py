@@ -0,0 +1,175 @@
+"""
+Detección de descargas completadas por eventos del sistema de archivos
+Usa watchdog (inotify en Linux) y, si no está instalado, un sondeo corto de la carpeta
+"""
+
+import os
+import time
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog es opcional
+    Observer = None
+    FileSystemEventHandler = object
+
+
+# Extensiones temporales que usa Chrome mientras escribe la descarga
+TEMP_EXTENSIONS = (".crdownload", ".tmp", ".part")
+
+
+def is_finished_download(path):
+    """
+    Indica si una ruta corresponde a una descarga terminada de Excel
+    
+    Args:
+        path (str): Ruta del archivo
+    
+    Returns:
+        bool: True si es un .xls/.xlsx definitivo
+    """
+    nombre = os.path.basename(path).lower()
+    if nombre.startswith(".") or nombre.endswith(TEMP_EXTENSIONS):
+        return False
+    return ".xls" in os.path.splitext(nombre)[1]
+
+
+class _DownloadEventHandler(FileSystemEventHandler):
+    """Recibe eventos de watchdog y avisa al watcher cuando termina una descarga"""
+    
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+    
+    def on_moved(self, event):
+        # Chrome renombra el .crdownload al nombre final cuando termina de escribir
+        if not event.is_directory and is_finished_download(event.dest_path):
+            self.watcher.notify(event.dest_path)
+    
+    def on_closed(self, event):
+        # IN_CLOSE_WRITE: el archivo se escribió directamente con su nombre final
+        if not event.is_directory and is_finished_download(event.src_path):
+            self.watcher.notify(event.src_path)
+    
+    def on_created(self, event):
+        # Plataformas sin evento de cierre: se confirma cuando no quedan temporales
+        if not event.is_directory and is_finished_download(event.src_path):
+            self.watcher.notify_created(event.src_path)
+
+
+class DownloadWatcher:
+    """
+    Observa una carpeta y devuelve la ruta exacta de la siguiente descarga completada
+    
+    Se debe iniciar antes de hacer click en el botón de descarga:
+        
+        with DownloadWatcher(carpeta) as watcher:
+            boton.click()
+            ruta = watcher.wait(timeout=60)
+    """
+    
+    def __init__(self, folder, poll_interval=0.1):
+        """
+        Inicializa el watcher
+        
+        Args:
+            folder (str): Carpeta donde el navegador guarda las descargas
+            poll_interval (float): Intervalo del sondeo cuando no hay watchdog
+        """
+        self.folder = os.path.abspath(folder)
+        self.poll_interval = poll_interval
+        self._done = threading.Event()
+        self._path = None
+        self._created = {}  # ruta -> último tamaño observado
+        self._observer = None
+        self._snapshot = None
+    
+    def start(self):
+        """Empieza a observar la carpeta"""
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_DownloadEventHandler(self), self.folder, recursive=False)
+            self._observer.start()
+        else:
+            self._snapshot = set(os.listdir(self.folder))
+        return self
+    
+    def stop(self):
+        """Deja de observar la carpeta"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def notify(self, path):
+        """Registra una descarga terminada (se conserva la primera)"""
+        if not self._done.is_set():
+            self._path = path
+            self._done.set()
+    
+    def notify_created(self, path):
+        """Registra un archivo final recién creado, pendiente de confirmar"""
+        self._created.setdefault(path, -1)
+    
+    def _has_temp_files(self):
+        with os.scandir(self.folder) as entries:
+            return any(e.name.endswith(TEMP_EXTENSIONS) for e in entries)
+    
+    def _confirm_created(self):
+        """Confirma archivos creados cuyo tamaño ya no cambia y sin temporales en la carpeta"""
+        if self._has_temp_files():
+            return
+        for path, tamano_previo in list(self._created.items()):
+            try:
+                tamano = os.path.getsize(path)
+            except OSError:
+                continue
+            if tamano > 0 and tamano == tamano_previo:
+                self.notify(path)
+                return
+            self._created[path] = tamano
+    
+    def _poll(self):
+        """Busca descargas nuevas comparando contra la foto inicial de la carpeta"""
+        nuevos = [
+            os.path.join(self.folder, nombre)
+            for nombre in set(os.listdir(self.folder)) - self._snapshot
+        ]
+        terminados = [p for p in nuevos if is_finished_download(p)]
+        if terminados and not self._has_temp_files():
+            self.notify(terminados[0])
+    
+    def wait(self, timeout=60):
+        """
+        Espera a que termine la descarga
+        
+        Args:
+            timeout (float): Tiempo máximo de espera en segundos
+        
+        Returns:
+            str: Ruta del archivo descargado o None si se agotó el tiempo
+        """
+        deadline = time.monotonic() + timeout
+        
+        while not self._done.is_set():
+            restante = deadline - time.monotonic()
+            if restante <= 0:
+                return None
+            
+            if self._observer is None:
+                self._poll()
+                self._done.wait(min(self.poll_interval, restante))
+                continue
+            
+            self._done.wait(min(self.poll_interval, restante))
+            if self._created and not self._done.is_set():
+                self._confirm_created()
+        
+        return self._path
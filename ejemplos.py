@@ -1,8 +1,11 @@
 """
 Ejemplo de uso programático del scraper
 Para automatización avanzada sin menú interactivo
+(para tareas programadas conviene usar directamente: python cli.py scrape ...)
 """
 
+import sys
+
 from scraper import UabcScraper
 from config import DATASETS
 
@@ -111,8 +114,6 @@ def ejemplo_programado():
     """Ejemplo: para programar ejecuciones automáticas"""
     print("Ejemplo 6: Para cron jobs o tareas programadas\n")
     
-    import sys
-    
     scraper = None
     exit_code = 0
     
@@ -151,7 +152,8 @@ if __name__ == "__main__":
     print("6. Para cron jobs (programado)")
     print("\n")
     
-    opcion = input("Selecciona (1-6): ").strip()
+    # El número de ejemplo puede pasarse como argumento: python ejemplos.py 6
+    opcion = sys.argv[1] if len(sys.argv) > 1 else input("Selecciona (1-6): ").strip()
     
     print("\n")
     
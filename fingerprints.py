@@ -0,0 +1,107 @@
+"""
+Registro de huellas del contenido de cada dataset
+Permite omitir la exportación cuando la tabla no cambió desde la última extracción exitosa
+y el archivo que se generó entonces sigue en disco
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+
+from config import CHANGE_DETECTION
+
+
+def fingerprint_key(salida, modo):
+    """
+    Clave de una huella en el registro
+    
+    La misma tabla produce archivos distintos según el motor o modo (exportación
+    de Excel, modo extract, HTTP), así que cada uno lleva su propia huella.
+    
+    Args:
+        salida (str): Dataset o sufijo de la variante de filtro
+        modo (str): Motor o modo que genera el archivo
+    
+    Returns:
+        str: Clave "{salida}|{modo}"
+    """
+    return f"{salida}|{modo}"
+
+
+class FingerprintStore:
+    """Archivo JSON con la última huella exitosa de cada salida y modo"""
+    
+    def __init__(self, state_file=None):
+        """
+        Inicializa el registro
+        
+        Args:
+            state_file (str): Ruta del archivo JSON (por defecto CHANGE_DETECTION["state_file"])
+        """
+        self.state_file = state_file or CHANGE_DETECTION["state_file"]
+        self._lock = threading.Lock()
+        self._data = self._load()
+    
+    def _load(self):
+        """Lee el archivo de estado; si no existe o está dañado empieza vacío"""
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def get(self, clave):
+        """
+        Obtiene la última huella registrada de una salida
+        
+        Args:
+            clave (str): Clave de fingerprint_key()
+        
+        Returns:
+            dict: Huella registrada o None
+        """
+        with self._lock:
+            return self._data.get(clave)
+    
+    def is_unchanged(self, clave, fingerprint):
+        """
+        Compara una huella con la última registrada
+        
+        Args:
+            clave (str): Clave de fingerprint_key()
+            fingerprint (dict): Huella actual ({"filas", "hash"})
+        
+        Returns:
+            bool: True si el contenido es idéntico al de la última extracción
+                y los archivos que generó siguen existiendo
+        """
+        previa = self.get(clave)
+        if not fingerprint or not previa or not previa.get("archivos"):
+            return False
+        if not all(os.path.exists(archivo) for archivo in previa["archivos"]):
+            return False
+        return previa["filas"] == fingerprint["filas"] and previa["hash"] == fingerprint["hash"]
+    
+    def update(self, clave, fingerprint, archivos):
+        """
+        Registra la huella de una extracción exitosa y guarda el archivo
+        
+        Args:
+            clave (str): Clave de fingerprint_key()
+            fingerprint (dict): Huella de la tabla exportada
+            archivos (list): Archivos que generó la extracción
+        """
+        if not fingerprint or not archivos:
+            return
+        
+        with self._lock:
+            self._data[clave] = dict(
+                fingerprint, archivos=list(archivos), fecha=datetime.now().isoformat(timespec="seconds")
+            )
+            
+            # Escritura atómica para no dejar el archivo a medias
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.state_file)
@@ -0,0 +1,233 @@
+"""
+Historial de ejecuciones: duración, tamaño y resultado de cada dataset por ejecución
+Compara la última ejecución con una línea base de las anteriores para detectar
+datasets que se volvieron más lentos o cuyo tamaño cambió de forma inusual
+"""
+
+import os
+import argparse
+from statistics import median
+from datetime import datetime
+
+from config import HISTORY_CONFIG
+from sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    run TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    intentos INTEGER,
+    segundos REAL,
+    archivos INTEGER,
+    bytes INTEGER,
+    fecha TEXT,
+    PRIMARY KEY (run, dataset)
+);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_dataset ON ejecuciones (dataset, run);
+"""
+
+
+class RunHistory(SQLiteStore):
+    """Serie de tiempo SQLite con una fila por (ejecución, dataset)"""
+    
+    def __init__(self, path=None):
+        """
+        Abre (o crea) el historial
+        
+        Args:
+            path (str): Ruta de la base SQLite (por defecto HISTORY_CONFIG["file"])
+        """
+        super().__init__(path or HISTORY_CONFIG["file"], SCHEMA)
+    
+    def record(self, run_id, dataset, estado, segundos, archivos=None, intentos=1):
+        """
+        Registra el resultado de un dataset en una ejecución
+        
+        Args:
+            run_id (str): Identificador de la ejecución
+            dataset (str): Nombre del dataset
+            estado (str): Resultado de extract_dataset
+            segundos (float): Duración total, incluidos los reintentos
+            archivos (list): Rutas generadas
+            intentos (int): Número de intentos
+        """
+        archivos = archivos or []
+        tamano = sum(os.path.getsize(a) for a in archivos if os.path.exists(a))
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO ejecuciones
+                    (run, dataset, estado, intentos, segundos, archivos, bytes, fecha)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id, dataset, estado, intentos, segundos, len(archivos), tamano,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+    
+    def runs(self):
+        """
+        Lista las ejecuciones registradas
+        
+        Returns:
+            list: Identificadores de ejecución del más antiguo al más reciente
+        """
+        return [r["run"] for r in self._query("SELECT DISTINCT run FROM ejecuciones ORDER BY run")]
+    
+    def run_rows(self, run_id):
+        """
+        Obtiene los datasets de una ejecución
+        
+        Returns:
+            dict: {dataset: registro}
+        """
+        filas = self._query("SELECT * FROM ejecuciones WHERE run = ?", (run_id,))
+        return {r["dataset"]: r for r in filas}
+    
+    def last_success(self):
+        """
+        Última extracción exitosa (descargada u omitida por no tener cambios) de cada dataset
+        
+        Returns:
+            dict: {dataset: datetime}
+        """
+        filas = self._query(
+            "SELECT dataset, MAX(fecha) AS fecha FROM ejecuciones "
+            "WHERE estado IN ('ok', 'omitido') GROUP BY dataset"
+        )
+        return {r["dataset"]: datetime.fromisoformat(r["fecha"]) for r in filas if r["fecha"]}
+    
+    def compare(self, run_id=None, baseline_runs=None, latency_threshold=None, size_threshold=None):
+        """
+        Compara una ejecución con la mediana de las ejecuciones exitosas anteriores
+        
+        Args:
+            run_id (str): Ejecución a revisar (por defecto la última)
+            baseline_runs (int): Ejecuciones anteriores que forman la línea base
+            latency_threshold (float): Aumento relativo de duración que se marca (0.5 = +50 %)
+            size_threshold (float): Cambio relativo de tamaño que se marca, en ambos sentidos
+        
+        Returns:
+            dict: {"run", "base", "datasets": [...], "alertas": [...]}
+        """
+        baseline_runs = baseline_runs or HISTORY_CONFIG["baseline_runs"]
+        if latency_threshold is None:
+            latency_threshold = HISTORY_CONFIG["latency_threshold"]
+        if size_threshold is None:
+            size_threshold = HISTORY_CONFIG["size_threshold"]
+        min_seconds = HISTORY_CONFIG["min_seconds_delta"]
+        
+        runs = self.runs()
+        if not runs:
+            return {"run": None, "base": [], "datasets": [], "alertas": []}
+        
+        run_id = run_id or runs[-1]
+        anteriores = [r for r in runs if r < run_id][-baseline_runs:]
+        actual = self.run_rows(run_id)
+        
+        base = {}
+        if anteriores:
+            marcas = ",".join("?" * len(anteriores))
+            for r in self._query(
+                f"SELECT * FROM ejecuciones WHERE estado = 'ok' AND run IN ({marcas})", anteriores
+            ):
+                base.setdefault(r["dataset"], []).append(r)
+        
+        datasets = []
+        alertas = []
+        for nombre, fila in sorted(actual.items()):
+            previas = base.get(nombre, [])
+            detalle = {
+                "dataset": nombre,
+                "estado": fila["estado"],
+                "segundos": fila["segundos"],
+                "bytes": fila["bytes"],
+                "base_segundos": median(p["segundos"] for p in previas) if previas else None,
+                "base_bytes": median(p["bytes"] for p in previas) if previas else None,
+                "muestras": len(previas),
+            }
+            datasets.append(detalle)
+            
+            if fila["estado"] not in ("ok", "omitido") and previas:
+                alertas.append(f"{nombre}: {fila['estado']} (antes exitoso)")
+            if fila["estado"] != "ok" or not previas:
+                continue
+            
+            base_seg = detalle["base_segundos"]
+            if fila["segundos"] - base_seg > min_seconds and fila["segundos"] > base_seg * (1 + latency_threshold):
+                alertas.append(
+                    f"{nombre}: duración {fila['segundos']:.1f} s vs {base_seg:.1f} s "
+                    f"(+{(fila['segundos'] / base_seg - 1) * 100:.0f} %)"
+                )
+            
+            base_bytes = detalle["base_bytes"]
+            if base_bytes and abs(fila["bytes"] - base_bytes) > base_bytes * size_threshold:
+                alertas.append(
+                    f"{nombre}: tamaño {fila['bytes'] / 1024:.1f} KB vs {base_bytes / 1024:.1f} KB "
+                    f"({(fila['bytes'] / base_bytes - 1) * 100:+.0f} %)"
+                )
+        
+        return {"run": run_id, "base": anteriores, "datasets": datasets, "alertas": alertas}
+
+
+def print_comparison(comparacion):
+    """Imprime el resultado de RunHistory.compare()"""
+    print("\n" + "="*80)
+    print("HISTORIAL DE EJECUCIONES")
+    print("="*80)
+    
+    if comparacion["run"] is None:
+        print("\n⚠️  No hay ejecuciones registradas")
+        return
+    
+    print(f"\nEjecución: {comparacion['run']}")
+    print(f"Línea base: {len(comparacion['base'])} ejecución(es) anteriores")
+    print("\n" + "-"*80)
+    print(f"{'Dataset':<45} {'Estado':<12} {'Seg':>8} {'Base':>8} {'KB':>9} {'Base':>9}")
+    print("-"*80)
+    
+    for d in comparacion["datasets"]:
+        base_seg = f"{d['base_segundos']:.1f}" if d["base_segundos"] is not None else "-"
+        base_kb = f"{d['base_bytes'] / 1024:.1f}" if d["base_bytes"] is not None else "-"
+        print(
+            f"{d['dataset']:<45} {d['estado']:<12} {d['segundos']:>8.1f} {base_seg:>8} "
+            f"{d['bytes'] / 1024:>9.1f} {base_kb:>9}"
+        )
+    
+    print("\n" + "-"*80)
+    if comparacion["alertas"]:
+        print("⚠️  Cambios fuera del umbral:")
+        for alerta in comparacion["alertas"]:
+            print(f"  - {alerta}")
+    else:
+        print("✓ Sin regresiones respecto a la línea base")
+    print("="*80)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Compara la última ejecución con las anteriores")
+    parser.add_argument("--run", help="Ejecución a revisar (por defecto la última)")
+    parser.add_argument("--base", type=int, help="Ejecuciones anteriores en la línea base")
+    parser.add_argument("--umbral-duracion", type=float, help="Aumento relativo de duración (0.5 = +50 %%)")
+    parser.add_argument("--umbral-tamano", type=float, help="Cambio relativo de tamaño (0.2 = ±20 %%)")
+    args = parser.parse_args()
+    
+    history = RunHistory()
+    try:
+        comparacion = history.compare(args.run, args.base, args.umbral_duracion, args.umbral_tamano)
+    finally:
+        history.close()
+    
+    print_comparison(comparacion)
+    
+    # Código de salida distinto de cero para usarlo en cron o CI
+    return 1 if comparacion["alertas"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""
+Motor de extracción por HTTP directo para Indicadores UABC
+Descarga el HTML de cada indicador y lee la tabla tblData sin abrir un navegador
+"""
+
+import os
+import re
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from base_scraper import BaseScraper, RESULT_OK, RESULT_SKIPPED, RESULT_FAILED, RESULT_UNSUPPORTED
+from config import HTTP_CONFIG, SELECTORS, FOLDERS
+from tables import parse_table, table_fingerprint, write_excel_html
+
+
+class HttpScraper(BaseScraper):
+    """Scraper que obtiene los datos con peticiones HTTP en lugar de Selenium"""
+    
+    fingerprint_mode = "http"
+    
+    def __init__(self, base_url=None, resume=False):
+        """
+        Inicializa el scraper
+        
+        Args:
+            base_url (str): URL base alternativa (por ejemplo un servidor local de pruebas)
+            resume (bool): Si es True, reanuda la última ejecución y omite lo ya completado
+        """
+        super().__init__(resume)
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        self.session = self.setup_session()
+    
+    def setup_session(self):
+        """
+        Configura una sesión HTTP con pool de conexiones keep-alive
+        
+        Returns:
+            requests.Session: Sesión lista para reutilizar conexiones
+        """
+        session = requests.Session()
+        retries = Retry(
+            total=HTTP_CONFIG["retries"],
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=HTTP_CONFIG["pool_maxsize"],
+            max_retries=retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": HTTP_CONFIG["user_agent"],
+            "Accept-Encoding": "gzip, deflate",
+        })
+        return session
+    
+    def fetch_page(self, url):
+        """
+        Descarga el HTML de una página del sitio
+        
+        Args:
+            url (str): Ruta relativa a la URL base
+        
+        Returns:
+            str: HTML de la página
+        """
+        with self.span("espera_limitador"):
+            self.rate_limiter.acquire()
+        inicio = time.monotonic()
+        try:
+            with self.span("carga_pagina"):
+                response = self.session.get(self.base_url + url, timeout=HTTP_CONFIG["timeout"])
+                response.raise_for_status()
+        except requests.RequestException:
+            self.rate_limiter.record(time.monotonic() - inicio, success=False)
+            raise
+        self.rate_limiter.record(time.monotonic() - inicio)
+        
+        # Sin charset en la cabecera requests asume ISO-8859-1 y rompe los acentos
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = response.apparent_encoding
+        
+        return response.text
+    
+    def extract_dataset(self, dataset):
+        """
+        Realiza un intento de extracción de un dataset
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+        
+        Returns:
+            str: RESULT_OK, RESULT_SKIPPED, RESULT_FAILED o RESULT_UNSUPPORTED
+        """
+        nombre = dataset["nombre"]
+        full_url = self.base_url + dataset["url"]
+        
+        self.log_message(f"Extrayendo (HTTP): {nombre}")
+        self.log_message(f"URL: {full_url}", "DEBUG")
+        
+        # Los datasets con filtros declarados no se piden: su vista depende del navegador
+        if "filtros" in dataset:
+            self.log_message(f"{nombre} tiene filtros declarados; usa el motor Selenium para este dataset", "WARNING")
+            return RESULT_UNSUPPORTED
+        
+        try:
+            page_html = self.fetch_page(dataset["url"])
+            
+            # Las vistas por filtro se recalculan en el navegador al cambiar cbNivel
+            if re.search(r'id=["\']?cbNivel\b', page_html):
+                self.log_message(
+                    f"{nombre} tiene filtros (cbNivel); usa el motor Selenium para este dataset",
+                    "WARNING"
+                )
+                return RESULT_UNSUPPORTED
+            
+            with self.span("lectura_tabla"):
+                headers, rows = parse_table(page_html, SELECTORS["tabla"])
+            if headers is None:
+                self.log_message(f"Tabla '{SELECTORS['tabla']}' no encontrada en {nombre}", "ERROR")
+                return RESULT_FAILED
+            
+            fingerprint = table_fingerprint(headers, rows)
+            if self.is_unchanged(nombre, fingerprint):
+                return RESULT_SKIPPED
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            new_filename = f"{FOLDERS['raw']}/{nombre}_{timestamp}.xls"
+            with self.span("escritura"):
+                write_excel_html(new_filename, headers, rows, SELECTORS["tabla"])
+            self.add_output(new_filename, len(rows), len(headers))
+            self.save_fingerprint(nombre, fingerprint, [new_filename])
+            
+            file_size = os.path.getsize(new_filename) / 1024
+            self.log_message(f"✓ Descarga exitosa: {os.path.basename(new_filename)}")
+            self.log_message(f"  Filas: {len(rows)} | Tamaño: {file_size:.2f} KB")
+            
+            return RESULT_OK
+        
+        except requests.RequestException as e:
+            self.log_message(f"Error HTTP en {nombre}: {e}", "ERROR")
+            return RESULT_FAILED
+        except Exception as e:
+            self.log_message(f"Error inesperado en {nombre}: {e}", "ERROR")
+            return RESULT_FAILED
+    
+    def spawn_worker(self, worker_id):
+        """
+        Crea un worker con su propia sesión HTTP
+        
+        Args:
+            worker_id (int): Identificador del worker
+        
+        Returns:
+            HttpScraper: Scraper independiente listo para extraer datasets
+        """
+        worker = super().spawn_worker(worker_id)
+        worker.session = worker.setup_session()
+        return worker
+    
+    def close(self):
+        """Cierra la sesión HTTP"""
+        if self.session:
+            self.session.close()
+            self.log_message("Sesión HTTP cerrada correctamente")
+        super().close()
@@ -0,0 +1,122 @@
+"""
+Bitácora de ejecución (append-only) con el resultado de cada dataset y filtro
+Permite reanudar una ejecución interrumpida procesando solo lo faltante o fallido
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+
+from config import JOURNAL_CONFIG
+
+
+class RunJournal:
+    """Archivo JSON Lines con un registro por intento de cada elemento"""
+    
+    def __init__(self, path=None):
+        """
+        Inicializa la bitácora
+        
+        Args:
+            path (str): Ruta del archivo (por defecto JOURNAL_CONFIG["file"])
+        """
+        self.path = path or JOURNAL_CONFIG["file"]
+        self.run_id = None
+        self._done = set()
+        self._lock = threading.Lock()
+    
+    def read_records(self):
+        """
+        Lee todos los registros de la bitácora
+        
+        Returns:
+            list: Registros en orden de escritura (se ignoran líneas dañadas)
+        """
+        if not os.path.exists(self.path):
+            return []
+        
+        registros = []
+        with open(self.path, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    # Última línea truncada por una interrupción
+                    continue
+        return registros
+    
+    def start_run(self, resume=False):
+        """
+        Inicia una ejecución nueva o reanuda la última
+        
+        Args:
+            resume (bool): Si es True, continúa la última ejecución registrada
+        
+        Returns:
+            str: Identificador de la ejecución
+        """
+        registros = self.read_records() if resume else []
+        
+        if registros:
+            self.run_id = registros[-1]["run"]
+            estados = {}
+            for r in registros:
+                if r["run"] == self.run_id:
+                    estados[r["item"]] = r["estado"]
+            self._done = {item for item, estado in estados.items() if estado in ("ok", "omitido")}
+        else:
+            # Con microsegundos: el planificador y el daemon pueden iniciar dos en el mismo segundo
+            self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            self._done = set()
+        
+        return self.run_id
+    
+    def is_done(self, item):
+        """
+        Indica si el elemento ya se completó en la ejecución actual
+        
+        Args:
+            item (str): Nombre del dataset o del archivo de un filtro
+        
+        Returns:
+            bool: True si su último registro fue exitoso
+        """
+        with self._lock:
+            return item in self._done
+    
+    def record(self, item, estado, archivos=None, intento=1, error=None):
+        """
+        Agrega un registro a la bitácora
+        
+        Args:
+            item (str): Nombre del dataset o del archivo de un filtro
+            estado (str): "ok", "omitido", "fallido" o "no_soportado"
+            archivos (list): Rutas generadas
+            intento (int): Número de intento
+            error (str): Descripción del error, si lo hubo
+        """
+        if self.run_id is None:
+            self.start_run()
+        
+        registro = {
+            "run": self.run_id,
+            "item": item,
+            "estado": estado,
+            "intento": intento,
+            "archivos": archivos or [],
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+        }
+        if error:
+            registro["error"] = error
+        
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            
+            if estado in ("ok", "omitido"):
+                self._done.add(item)
+            else:
+                self._done.discard(item)
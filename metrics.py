@@ -0,0 +1,207 @@
+"""
+Medición del tiempo de cada fase de la extracción (arranque de Chrome, carga de
+página, espera de la tabla, recarga de filtros, descarga...)
+Agrega los tiempos por dataset y por ejecución y los exporta como JSON y como
+archivo para el textfile collector de Prometheus
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import METRICS_CONFIG
+
+
+class RunMetrics:
+    """Registro thread-safe de spans (fase, dataset, duración) de una ejecución"""
+    
+    def __init__(self, on_record=None):
+        """
+        Inicializa el registro vacío
+        
+        Args:
+            on_record (callable): Se llama con cada span registrado (p. ej. para el log)
+        """
+        self.spans = []
+        self.on_record = on_record
+        self._lock = threading.Lock()
+    
+    def record(self, fase, segundos, dataset=None, ok=True):
+        """
+        Registra la duración de una fase
+        
+        Args:
+            fase (str): Nombre de la fase
+            segundos (float): Duración
+            dataset (str): Dataset en curso (None = fase de la ejecución, p. ej. arranque)
+            ok (bool): False si la fase terminó con una excepción
+        """
+        span = {"fase": fase, "dataset": dataset, "segundos": segundos, "ok": ok}
+        with self._lock:
+            self.spans.append(span)
+        if self.on_record:
+            self.on_record(span)
+    
+    @contextmanager
+    def span(self, fase, dataset=None):
+        """
+        Mide el bloque de código como una fase
+        
+        Args:
+            fase (str): Nombre de la fase
+            dataset (str): Dataset en curso
+        """
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(fase, time.perf_counter() - inicio, dataset, ok)
+    
+    @staticmethod
+    def _aggregate(spans):
+        """Agrupa spans por fase: número, total, máximo y errores"""
+        fases = {}
+        for s in spans:
+            agregado = fases.setdefault(s["fase"], {"n": 0, "total": 0.0, "max": 0.0, "errores": 0})
+            agregado["n"] += 1
+            agregado["total"] += s["segundos"]
+            agregado["max"] = max(agregado["max"], s["segundos"])
+            if not s["ok"]:
+                agregado["errores"] += 1
+        return fases
+    
+    def by_phase(self):
+        """
+        Tiempos de toda la ejecución por fase
+        
+        Returns:
+            dict: {fase: {"n", "total", "max", "errores"}}
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return self._aggregate(spans)
+    
+    def by_dataset(self):
+        """
+        Tiempos por dataset y fase
+        
+        Returns:
+            dict: {dataset: {fase: {"n", "total", "max", "errores"}}}
+        """
+        with self._lock:
+            spans = list(self.spans)
+        
+        por_dataset = {}
+        for s in spans:
+            if s["dataset"] is not None:
+                por_dataset.setdefault(s["dataset"], []).append(s)
+        return {nombre: self._aggregate(lista) for nombre, lista in por_dataset.items()}
+    
+    def to_dict(self, run_id, stats):
+        """
+        Resumen de la ejecución
+        
+        Args:
+            run_id (str): Identificador de la ejecución
+            stats (dict): Estadísticas del scraper
+        
+        Returns:
+            dict: Resumen serializable
+        """
+        return {
+            "run": run_id,
+            "inicio": stats["inicio"].isoformat(timespec="seconds"),
+            "duracion_segundos": (datetime.now() - stats["inicio"]).total_seconds(),
+            "resultados": {k: stats[k] for k in ("total", "exitosos", "fallidos", "omitidos", "no_soportados", "reanudados")},
+            "fases": self.by_phase(),
+            "datasets": self.by_dataset(),
+        }
+    
+    def write_json(self, path, run_id, stats):
+        """
+        Guarda el resumen como JSON
+        
+        Args:
+            path (str): Ruta del archivo
+            run_id (str): Identificador de la ejecución
+            stats (dict): Estadísticas del scraper
+        """
+        _write_atomic(path, json.dumps(self.to_dict(run_id, stats), ensure_ascii=False, indent=2))
+    
+    def write_prometheus(self, path, run_id, stats):
+        """
+        Guarda el resumen en formato de texto de Prometheus (textfile collector)
+        
+        Args:
+            path (str): Ruta del archivo .prom
+            run_id (str): Identificador de la ejecución
+            stats (dict): Estadísticas del scraper
+        """
+        resumen = self.to_dict(run_id, stats)
+        prefijo = METRICS_CONFIG["prometheus_prefix"]
+        lineas = []
+        
+        # Totales y desglose por dataset en métricas separadas: sumar por fase
+        # una sola serie contaría dos veces cada span
+        lineas.append(f"# HELP {prefijo}_phase_seconds Tiempo por fase de la última ejecución")
+        lineas.append(f"# TYPE {prefijo}_phase_seconds summary")
+        for fase, agregado in resumen["fases"].items():
+            etiquetas = _labels(fase=fase)
+            lineas.append(f"{prefijo}_phase_seconds_sum{etiquetas} {agregado['total']:.6f}")
+            lineas.append(f"{prefijo}_phase_seconds_count{etiquetas} {agregado['n']}")
+        
+        lineas.append(f"# HELP {prefijo}_dataset_phase_seconds Tiempo por dataset y fase de la última ejecución")
+        lineas.append(f"# TYPE {prefijo}_dataset_phase_seconds summary")
+        for dataset, fases in resumen["datasets"].items():
+            for fase, agregado in fases.items():
+                etiquetas = _labels(fase=fase, dataset=dataset)
+                lineas.append(f"{prefijo}_dataset_phase_seconds_sum{etiquetas} {agregado['total']:.6f}")
+                lineas.append(f"{prefijo}_dataset_phase_seconds_count{etiquetas} {agregado['n']}")
+        
+        lineas.append(f"# HELP {prefijo}_phase_max_seconds Duración máxima de una fase en la última ejecución")
+        lineas.append(f"# TYPE {prefijo}_phase_max_seconds gauge")
+        for fase, agregado in resumen["fases"].items():
+            lineas.append(f"{prefijo}_phase_max_seconds{_labels(fase=fase)} {agregado['max']:.6f}")
+        
+        lineas.append(f"# HELP {prefijo}_phase_errors Fases terminadas con error en la última ejecución")
+        lineas.append(f"# TYPE {prefijo}_phase_errors gauge")
+        for fase, agregado in resumen["fases"].items():
+            lineas.append(f"{prefijo}_phase_errors{_labels(fase=fase)} {agregado['errores']}")
+        
+        lineas.append(f"# HELP {prefijo}_datasets Datasets de la última ejecución por resultado")
+        lineas.append(f"# TYPE {prefijo}_datasets gauge")
+        for resultado, valor in resumen["resultados"].items():
+            lineas.append(f"{prefijo}_datasets{_labels(resultado=resultado)} {valor}")
+        
+        lineas.append(f"# HELP {prefijo}_run_duration_seconds Duración de la última ejecución")
+        lineas.append(f"# TYPE {prefijo}_run_duration_seconds gauge")
+        lineas.append(f"{prefijo}_run_duration_seconds {resumen['duracion_segundos']:.3f}")
+        
+        lineas.append(f"# HELP {prefijo}_last_run_timestamp_seconds Fin de la última ejecución (epoch)")
+        lineas.append(f"# TYPE {prefijo}_last_run_timestamp_seconds gauge")
+        lineas.append(f"{prefijo}_last_run_timestamp_seconds {time.time():.0f}")
+        
+        _write_atomic(path, "\n".join(lineas) + "\n")
+
+
+def _labels(**etiquetas):
+    """Formatea etiquetas de Prometheus escapando barras, comillas y saltos de línea"""
+    partes = []
+    for clave, valor in etiquetas.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{clave}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _write_atomic(path, contenido):
+    """Escribe un archivo completo de una vez (el collector nunca lee uno a medias)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    os.replace(temp_file, path)
@@ -0,0 +1,410 @@
+"""
+Planificador de actualizaciones por prioridad
+Cada dataset de config.DATASETS tiene un intervalo de actualización (según su
+prioridad o explícito con "intervalo_horas"). Una cola de prioridad ordena el
+trabajo vencido y lo reparte entre los workers del scraper o lo envía al daemon
+"""
+
+import sys
+import time
+import heapq
+import argparse
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+from config import DATASETS, SCHEDULER_CONFIG
+
+
+# Resultados de extract_dataset que cuentan como actualización (igual que en base_scraper)
+REFRESHED = ("ok", "omitido")
+
+# El motor no puede extraer el dataset (p. ej. filtros con el motor HTTP): reintentar no sirve
+UNSUPPORTED = "no_soportado"
+
+
+def refresh_interval(dataset):
+    """
+    Intervalo de actualización de un dataset
+    
+    Args:
+        dataset (dict): Entrada de config.DATASETS
+    
+    Returns:
+        timedelta: "intervalo_horas" del dataset o el de su prioridad
+    """
+    horas = dataset.get("intervalo_horas")
+    if horas is None:
+        horas = SCHEDULER_CONFIG["interval_hours"].get(
+            dataset.get("prioridad"), SCHEDULER_CONFIG["default_interval_hours"]
+        )
+    return timedelta(hours=horas)
+
+
+def last_refresh_times(history, catalog=None):
+    """
+    Última actualización conocida de cada dataset
+    
+    Combina el historial de ejecuciones (incluye datasets omitidos por no tener
+    cambios) con el catálogo (archivos descargados antes de existir el historial).
+    
+    Args:
+        history (RunHistory): Historial de ejecuciones
+        catalog (DownloadCatalog): Catálogo de archivos (opcional)
+    
+    Returns:
+        dict: {dataset: datetime}
+    """
+    ultimos = history.last_success()
+    if catalog is not None:
+        for nombre, registro in catalog.latest_per_dataset().items():
+            fecha = datetime.strptime(registro["timestamp"], "%Y%m%d_%H%M%S")
+            if nombre not in ultimos or fecha > ultimos[nombre]:
+                ultimos[nombre] = fecha
+    return ultimos
+
+
+class RefreshScheduler:
+    """Cola de prioridad (heap) de datasets por fecha de vencimiento"""
+    
+    def __init__(self, datasets=None, last_refresh=None, now=None):
+        """
+        Programa cada dataset según su última actualización
+        
+        Args:
+            datasets (list): Datasets a programar (por defecto config.DATASETS)
+            last_refresh (dict): {dataset: datetime} de la última actualización;
+                los datasets sin registro vencen de inmediato
+            now (datetime): Momento de referencia
+        """
+        self.datasets = {d["nombre"]: d for d in (datasets or DATASETS)}
+        self._heap = []
+        self._due = {}  # Vencimiento vigente de cada dataset en la cola
+        self._running = set()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        
+        now = now or datetime.now()
+        last_refresh = last_refresh or {}
+        for nombre, dataset in self.datasets.items():
+            ultimo = last_refresh.get(nombre)
+            self.request(nombre, ultimo + refresh_interval(dataset) if ultimo else now)
+    
+    def request(self, nombre, when=None):
+        """
+        Solicita actualizar un dataset
+        
+        Las solicitudes duplicadas se combinan: si el dataset ya está en la cola
+        con un vencimiento igual o anterior, o se está extrayendo, no se agrega otra vez.
+        
+        Args:
+            nombre (str): Nombre del dataset
+            when (datetime): Momento a partir del cual vence (por defecto ahora)
+        
+        Returns:
+            bool: True si la solicitud cambió la cola
+        """
+        if nombre not in self.datasets:
+            raise KeyError(f"Dataset desconocido: {nombre}")
+        when = when or datetime.now()
+        
+        with self._lock:
+            if nombre in self._running:
+                return False
+            if nombre in self._due and self._due[nombre] <= when:
+                return False
+            
+            # La entrada anterior queda en el heap y se descarta al salir (ya no coincide con _due)
+            self._due[nombre] = when
+            prioridad = self.datasets[nombre].get("prioridad", 99)
+            heapq.heappush(self._heap, (when, prioridad, next(self._seq), nombre))
+            return True
+    
+    def pop_due(self, now=None, limit=None):
+        """
+        Saca de la cola los datasets vencidos y los marca en curso
+        
+        Args:
+            now (datetime): Momento de referencia
+            limit (int): Máximo de datasets (None o 0 = todos); los de mayor
+                prioridad salen primero y el resto sigue en la cola
+        
+        Returns:
+            list: Datasets ordenados por prioridad y antigüedad del vencimiento
+        """
+        now = now or datetime.now()
+        
+        with self._lock:
+            vencidos = []
+            while self._heap and self._heap[0][0] <= now:
+                entrada = heapq.heappop(self._heap)
+                when, _, _, nombre = entrada
+                if self._due.get(nombre) == when:
+                    vencidos.append(entrada)
+            
+            vencidos.sort(key=lambda e: (e[1], e[0], e[2]))
+            if limit:
+                for entrada in vencidos[limit:]:
+                    heapq.heappush(self._heap, entrada)
+                vencidos = vencidos[:limit]
+            
+            lote = []
+            for _, _, _, nombre in vencidos:
+                del self._due[nombre]
+                self._running.add(nombre)
+                lote.append(self.datasets[nombre])
+            return lote
+    
+    def complete(self, nombre, ok, now=None):
+        """
+        Reprograma un dataset terminado
+        
+        Args:
+            nombre (str): Nombre del dataset
+            ok (bool): True si se actualizó; si falló se reintenta tras
+                SCHEDULER_CONFIG["retry_minutes"]
+            now (datetime): Momento de referencia
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._running.discard(nombre)
+        
+        if ok:
+            siguiente = now + refresh_interval(self.datasets[nombre])
+        else:
+            siguiente = now + timedelta(minutes=SCHEDULER_CONFIG["retry_minutes"])
+        self.request(nombre, siguiente)
+    
+    def drop(self, nombre):
+        """
+        Quita un dataset del programa (terminado o en cola) sin reprogramarlo
+        
+        Args:
+            nombre (str): Nombre del dataset
+        """
+        with self._lock:
+            self._running.discard(nombre)
+            # Su entrada en el heap se descarta al salir porque ya no coincide con _due
+            self._due.pop(nombre, None)
+    
+    def next_due(self):
+        """
+        Próximo vencimiento de la cola
+        
+        Returns:
+            datetime: Vencimiento más cercano o None si la cola está vacía
+        """
+        with self._lock:
+            while self._heap:
+                when, _, _, nombre = self._heap[0]
+                if self._due.get(nombre) == when:
+                    return when
+                heapq.heappop(self._heap)
+            return None
+    
+    def schedule(self):
+        """
+        Programa actual
+        
+        Returns:
+            list: [(vencimiento, dataset)] ordenados por vencimiento
+        """
+        with self._lock:
+            programa = [(when, self.datasets[nombre]) for nombre, when in self._due.items()]
+        return sorted(programa, key=lambda p: (p[0], p[1].get("prioridad", 99)))
+
+
+class LocalDispatcher:
+    """Ejecuta cada lote con un scraper de este proceso"""
+    
+    def __init__(self, scraper, workers=None, tabs=None):
+        """
+        Args:
+            scraper (BaseScraper): Motor ya inicializado
+            workers (int): Workers en paralelo
+            tabs (int): Pestañas de Chrome (solo motor Selenium)
+        """
+        self.scraper = scraper
+        self.workers = workers
+        self.tabs = tabs
+    
+    def __call__(self, datasets):
+        """
+        Extrae un lote de datasets
+        
+        Returns:
+            dict: {dataset: resultado}
+        """
+        scraper = self.scraper
+        scraper.reset_run(total=len(datasets))
+        if self.tabs:
+            scraper.scrape_datasets(datasets, self.workers, self.tabs)
+        else:
+            scraper.scrape_datasets(datasets, self.workers)
+        scraper.print_summary()
+        
+        filas = scraper.history.run_rows(scraper.journal.run_id)
+        return {nombre: fila["estado"] for nombre, fila in filas.items()}
+
+
+class DaemonDispatcher:
+    """Envía cada lote al daemon, que ya tiene Chrome abierto"""
+    
+    def __init__(self, history, workers=None, tabs=None):
+        """
+        Args:
+            history (RunHistory): Historial donde el daemon registra los resultados
+            workers (int): Workers en paralelo
+            tabs (int): Pestañas de Chrome
+        """
+        self.history = history
+        self.workers = workers
+        self.tabs = tabs
+    
+    def __call__(self, datasets):
+        """
+        Extrae un lote de datasets en el daemon
+        
+        Returns:
+            dict: {dataset: resultado}
+        """
+        from daemon import send_request
+        
+        respuesta = send_request({
+            "accion": "scrape",
+            "datasets": [d["nombre"] for d in datasets],
+            "workers": self.workers,
+            "tabs": self.tabs,
+        })
+        if not respuesta.get("run"):
+            print(f"❌ El daemon no ejecutó el lote: {respuesta.get('error')}")
+            return {}
+        
+        filas = self.history.run_rows(respuesta["run"])
+        return {nombre: fila["estado"] for nombre, fila in filas.items()}
+
+
+def run_scheduler(scheduler, dispatch, once=False, poll_seconds=None, max_batch=None):
+    """
+    Bucle del planificador: despacha los datasets vencidos y espera al siguiente
+    
+    Args:
+        scheduler (RefreshScheduler): Cola de datasets
+        dispatch (callable): Recibe una lista de datasets y devuelve {dataset: resultado}
+        once (bool): Terminar cuando no quede nada vencido
+        poll_seconds (float): Espera máxima entre revisiones
+            (por defecto SCHEDULER_CONFIG["poll_seconds"])
+        max_batch (int): Datasets por lote (por defecto SCHEDULER_CONFIG["max_batch"])
+    
+    Returns:
+        int: Datasets que fallaron en el último lote (los que el motor no
+            soporta se quitan del programa y no cuentan)
+    """
+    if poll_seconds is None:
+        poll_seconds = SCHEDULER_CONFIG["poll_seconds"]
+    if max_batch is None:
+        max_batch = SCHEDULER_CONFIG["max_batch"]
+    
+    fallidos = 0
+    while True:
+        lote = scheduler.pop_due(limit=max_batch)
+        if lote:
+            print(f"\n[{datetime.now():%Y-%m-%d %H:%M:%S}] Lote: {', '.join(d['nombre'] for d in lote)}")
+            try:
+                resultados = dispatch(lote)
+            except Exception as e:
+                print(f"❌ Error al despachar el lote: {e}")
+                resultados = {}
+            
+            fallidos = 0
+            for dataset in lote:
+                resultado = resultados.get(dataset["nombre"])
+                if resultado == UNSUPPORTED:
+                    print(f"  {dataset['nombre']}: el motor no lo soporta, se quita del programa")
+                    scheduler.drop(dataset["nombre"])
+                    continue
+                ok = resultado in REFRESHED
+                scheduler.complete(dataset["nombre"], ok)
+                fallidos += not ok
+            continue
+        
+        if once:
+            return fallidos
+        
+        siguiente = scheduler.next_due()
+        espera = poll_seconds
+        if siguiente is not None:
+            espera = min(poll_seconds, max(0.0, (siguiente - datetime.now()).total_seconds()))
+        time.sleep(espera)
+
+
+def print_schedule(scheduler):
+    """Imprime el próximo vencimiento de cada dataset"""
+    now = datetime.now()
+    print("\n" + "="*80)
+    print("PROGRAMA DE ACTUALIZACIONES")
+    print("="*80)
+    print(f"\n{'Dataset':<45} {'Prior.':>6} {'Cada':>8}  {'Vence'}")
+    print("-"*80)
+    for when, dataset in scheduler.schedule():
+        horas = refresh_interval(dataset).total_seconds() / 3600
+        vence = "ahora" if when <= now else f"{when:%Y-%m-%d %H:%M}"
+        print(f"{dataset['nombre']:<45} {dataset.get('prioridad', '-'):>6} {horas:>7.0f}h  {vence}")
+    print("="*80)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Actualiza los datasets según su prioridad")
+    parser.add_argument("--una-vez", action="store_true", help="Extraer lo vencido y terminar (para cron)")
+    parser.add_argument("--listar", action="store_true", help="Mostrar el programa sin extraer nada")
+    parser.add_argument("--motor", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--daemon", action="store_true", help="Enviar los lotes al daemon")
+    parser.add_argument("--workers", type=int, help="Workers en paralelo")
+    parser.add_argument("--pestanas", type=int, help="Pestañas de un solo Chrome")
+    parser.add_argument("--lote", type=int, help="Máximo de datasets por ejecución")
+    parser.add_argument("--con-ventana", action="store_true", help="Mostrar la ventana de Chrome")
+    args = parser.parse_args()
+    
+    from history import RunHistory
+    from catalog import DownloadCatalog
+    
+    history = RunHistory()
+    catalog = DownloadCatalog()
+    try:
+        scheduler = RefreshScheduler(last_refresh=last_refresh_times(history, catalog))
+    finally:
+        catalog.close()
+    
+    if args.listar:
+        print_schedule(scheduler)
+        history.close()
+        return 0
+    
+    scraper = None
+    try:
+        if args.daemon:
+            dispatch = DaemonDispatcher(history, args.workers, args.pestanas)
+        elif args.motor == "http":
+            from http_scraper import HttpScraper
+            scraper = HttpScraper()
+            dispatch = LocalDispatcher(scraper, args.workers)
+        else:
+            from scraper import UabcScraper
+            scraper = UabcScraper(headless=not args.con_ventana)
+            dispatch = LocalDispatcher(scraper, args.workers, args.pestanas)
+        
+        fallidos = run_scheduler(scheduler, dispatch, once=args.una_vez, max_batch=args.lote)
+        return 0 if fallidos == 0 else 1
+    
+    except KeyboardInterrupt:
+        print("\n\nPlanificador detenido por el usuario")
+        return 130
+    finally:
+        if scraper:
+            scraper.close()
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
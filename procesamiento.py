@@ -0,0 +1,322 @@
+"""
+Normalización de las descargas a formato largo (tidy) en Parquet
+Convierte la última exportación de cada salida (Excel, tabla HTML .xls o la
+salida del modo extract) en una tabla con una fila por observación:
+dataset, salida, periodo, año, unidad, detalle, métrica y valor, con columnas tipadas
+"""
+
+import os
+import re
+import sys
+import argparse
+import unicodedata
+from datetime import datetime
+
+import pandas as pd
+
+from config import FOLDERS
+from catalog import DownloadCatalog
+from tables import EMPTY_VALUES, THOUSANDS_RE, parse_table, unique_headers
+from validator import ZIP_MAGIC, OLE_MAGIC
+
+
+# Encabezados o valores con forma de periodo: 2019, 2019-1, 2019-2, 2019-2020, 2019/II
+PERIOD_RE = re.compile(r"^(?:19|20)\d{2}(?:\s*[-/ ]\s*(?:I{1,2}|\d{1,2}|(?:19|20)\d{2}))?$")
+
+# Encabezados de una columna de periodos (sin acentos y en minúsculas)
+PERIOD_HEADERS = {"periodo", "ano", "anio", "ciclo", "ciclo escolar", "semestre", "periodo escolar"}
+
+# Esquema de salida
+COLUMNS = ["dataset", "salida", "periodo", "anio", "unidad", "detalle", "metrica", "valor", "fecha_descarga"]
+
+
+def _plain(texto):
+    """Minúsculas sin acentos ni espacios repetidos"""
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+
+def read_raw_table(filepath):
+    """
+    Lee una exportación como DataFrame de texto
+    
+    Args:
+        filepath (str): xlsx, xls binario, tabla HTML con extensión .xls, CSV o Parquet
+    
+    Returns:
+        DataFrame: Columnas con los encabezados originales y celdas como string
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == ".parquet":
+        return pd.read_parquet(filepath).astype("string")
+    if extension == ".csv":
+        return pd.read_csv(filepath, dtype="string", keep_default_na=False)
+    
+    with open(filepath, "rb") as f:
+        firma = f.read(len(OLE_MAGIC))
+    
+    if firma.startswith(ZIP_MAGIC) or firma == OLE_MAGIC:
+        df = pd.read_excel(filepath, sheet_name=0, dtype=str)
+        df.columns = unique_headers([str(c).strip() for c in df.columns])
+        return df.astype("string")
+    
+    with open(filepath, encoding="utf-8", errors="replace") as f:
+        headers, rows = parse_table(f.read(), None)
+    if headers is None:
+        raise ValueError("no se encontró ninguna tabla en el archivo")
+    
+    nombres = unique_headers(headers)
+    ancho = len(nombres)
+    filas = [(r + [""] * ancho)[:ancho] for r in rows]
+    return pd.DataFrame(filas, columns=nombres, dtype="string")
+
+
+def to_number(serie):
+    """
+    Convierte una columna de texto a números de forma vectorizada
+    
+    Acepta separadores de miles, porcentajes y signos de moneda; los valores
+    vacíos del sitio (EMPTY_VALUES) y las comas decimales (12,5) quedan como nulos.
+    
+    Args:
+        serie (Series): Columna de texto
+    
+    Returns:
+        tuple: (Series Float64, Series bool de celdas vacías)
+    """
+    texto = serie.astype("string").str.strip()
+    vacio = texto.isna() | texto.isin(EMPTY_VALUES)
+    limpio = texto.mask(vacio).str.replace(r"[%$\s]", "", regex=True)
+    # Las comas solo se quitan como separador de miles; "12,5" no es número
+    con_coma = limpio.str.contains(",", regex=False).fillna(False)
+    miles = limpio.str.match(THOUSANDS_RE.pattern).fillna(False)
+    limpio = limpio.mask(con_coma & ~miles).str.replace(",", "", regex=False)
+    return pd.to_numeric(limpio, errors="coerce").astype("Float64"), vacio
+
+
+def is_numeric(serie):
+    """True si todos los valores no vacíos de la columna son números"""
+    numeros, vacio = to_number(serie)
+    return bool(numeros.notna().any() and (numeros.notna() | vacio).all())
+
+
+def is_period_column(nombre, serie):
+    """True si el encabezado o todos los valores de la columna son periodos"""
+    if _plain(nombre) in PERIOD_HEADERS:
+        return True
+    valores = serie.dropna().str.strip()
+    valores = valores[valores != ""]
+    return bool(len(valores) and valores.str.match(PERIOD_RE).all())
+
+
+def tidy_table(df, dataset, salida, fecha_descarga):
+    """
+    Convierte una tabla ancha en formato largo
+    
+    Reconoce dos formas:
+      - periodos como columnas (2015, 2016, ...; basta una): cada columna de
+        periodo es una observación de la métrica del dataset
+      - periodos en una columna (o sin periodo, en las tablas actuales): cada
+        columna numérica es una métrica
+    
+    La primera columna de texto es la unidad (unidad académica, área de
+    conocimiento o campus, según la tabla) y las demás se unen en "detalle".
+    Se descartan las filas de totales y las celdas sin dato.
+    
+    Args:
+        df (DataFrame): Tabla de texto (read_raw_table)
+        dataset (str): Nombre del dataset
+        salida (str): Salida (dataset o variante de filtro)
+        fecha_descarga (datetime): Momento de la exportación
+    
+    Returns:
+        DataFrame: Columnas COLUMNS
+    """
+    nombres = list(df.columns)
+    columnas_periodo = [c for c in nombres if PERIOD_RE.match(str(c).strip())]
+    
+    if columnas_periodo:
+        # Los totales por fila (columnas numéricas que no son periodo) se descartan
+        dimensiones = [c for c in nombres if c not in columnas_periodo and not is_numeric(df[c])]
+        largo = df.melt(id_vars=dimensiones, value_vars=columnas_periodo, var_name="periodo", value_name="valor")
+        largo["metrica"] = dataset
+    else:
+        columna_periodo = next((c for c in nombres if is_period_column(c, df[c])), None)
+        resto = [c for c in nombres if c != columna_periodo]
+        metricas = [c for c in resto if is_numeric(df[c])]
+        dimensiones = [c for c in resto if c not in metricas]
+        ids = dimensiones + ([columna_periodo] if columna_periodo else [])
+        largo = df.melt(id_vars=ids, value_vars=metricas, var_name="metrica", value_name="valor")
+        largo["periodo"] = largo[columna_periodo] if columna_periodo else pd.NA
+    
+    resultado = pd.DataFrame(index=largo.index)
+    resultado["dataset"] = dataset
+    resultado["salida"] = salida
+    resultado["periodo"] = largo["periodo"].astype("string").str.strip()
+    resultado["anio"] = resultado["periodo"].str.extract(r"((?:19|20)\d{2})", expand=False).astype("Int16")
+    
+    if dimensiones:
+        resultado["unidad"] = largo[dimensiones[0]].astype("string").str.strip()
+    else:
+        resultado["unidad"] = pd.Series(pd.NA, index=largo.index, dtype="string")
+    if len(dimensiones) > 1:
+        resultado["detalle"] = largo[dimensiones[1]].astype("string").str.cat(
+            [largo[c].astype("string") for c in dimensiones[2:]], sep=" | "
+        )
+    else:
+        resultado["detalle"] = pd.Series(pd.NA, index=largo.index, dtype="string")
+    
+    resultado["metrica"] = largo["metrica"].astype("string")
+    resultado["valor"], _ = to_number(largo["valor"])
+    resultado["fecha_descarga"] = pd.Timestamp(fecha_descarga)
+    
+    es_total = resultado["unidad"].str.lower().str.startswith("total").fillna(False)
+    resultado = resultado[resultado["valor"].notna() & ~es_total]
+    
+    for columna in ("dataset", "salida", "unidad", "metrica"):
+        resultado[columna] = resultado[columna].astype("category")
+    return resultado[COLUMNS].reset_index(drop=True)
+
+
+def tidy_path(salida):
+    """Ruta del Parquet en formato largo de una salida"""
+    return os.path.join(FOLDERS["tidy"], f"{salida}.parquet")
+
+
+def process_file(registro, force=False):
+    """
+    Normaliza un archivo del catálogo si su Parquet no existe o es anterior
+    
+    Args:
+        registro (dict): Registro del catálogo (ruta, dataset, salida, timestamp)
+        force (bool): Regenerar aunque el Parquet esté al día
+    
+    Returns:
+        dict: {"salida", "estado", "filas", "destino"} con estado "ok", "al_dia" o "error"
+    """
+    destino = tidy_path(registro["salida"])
+    resultado = {"salida": registro["salida"], "estado": "al_dia", "filas": None, "destino": destino}
+    
+    if not force and os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(registro["ruta"]):
+        return resultado
+    
+    try:
+        df = read_raw_table(registro["ruta"])
+        fecha = datetime.strptime(registro["timestamp"], "%Y%m%d_%H%M%S")
+        largo = tidy_table(df, registro["dataset"], registro["salida"], fecha)
+        
+        # Escritura atómica con temporal oculto, igual que write_typed_table
+        temp_path = os.path.join(FOLDERS["tidy"], f".{registro['salida']}.parquet.part")
+        largo.to_parquet(temp_path, index=False)
+        os.replace(temp_path, destino)
+        
+        resultado.update(estado="ok", filas=len(largo))
+    except Exception as e:
+        resultado.update(estado="error", error=str(e))
+    return resultado
+
+
+def process_latest(catalog=None, force=False, salidas=None):
+    """
+    Normaliza la última exportación de cada salida del catálogo
+    
+    Args:
+        catalog (DownloadCatalog): Catálogo (por defecto se abre uno)
+        force (bool): Regenerar todos los Parquet
+        salidas (list): Limitar a estas salidas (None = todas)
+    
+    Returns:
+        list: Resultados de process_file
+    """
+    propio = catalog is None
+    catalog = catalog or DownloadCatalog()
+    try:
+        registros = catalog.latest_per_output()
+    finally:
+        if propio:
+            catalog.close()
+    
+    os.makedirs(FOLDERS["tidy"], exist_ok=True)
+    return [
+        process_file(registro, force)
+        for salida, registro in sorted(registros.items())
+        if registro["dataset"] and (not salidas or salida in salidas)
+    ]
+
+
+# Tablas de ejemplo de cada forma que reconoce tidy_table, con los periodos esperados
+LAYOUT_SAMPLES = [
+    (
+        "un periodo como columna",
+        {"Unidad académica": ["Mexicali", "Tijuana", "Total"], "2020": ["1,200", "800", "2,000"]},
+        ["2020", "2020"],
+    ),
+    (
+        "varios periodos como columnas",
+        {"Unidad académica": ["Mexicali"], "2019": ["10"], "2020": ["12"]},
+        ["2019", "2020"],
+    ),
+    (
+        "periodos en una columna",
+        {"Periodo": ["2019-1", "2019-2"], "Hombres": ["1", "2"]},
+        ["2019-1", "2019-2"],
+    ),
+]
+
+
+def check_layouts():
+    """
+    Normaliza las tablas de LAYOUT_SAMPLES y compara los periodos obtenidos
+    
+    Returns:
+        list: Descripción de las formas cuyo resultado no coincide (vacía si todo está bien)
+    """
+    errores = []
+    for forma, columnas, esperados in LAYOUT_SAMPLES:
+        df = pd.DataFrame(columnas, dtype="string")
+        largo = tidy_table(df, "Ejemplo", "Ejemplo", datetime(2020, 1, 1))
+        periodos = largo["periodo"].fillna("<NA>").tolist()
+        if periodos != esperados:
+            errores.append(f"{forma}: se esperaba {esperados} y se obtuvo {periodos}")
+    return errores
+
+
+def print_results(resultados):
+    """Imprime el resultado de process_latest()"""
+    print("\n" + "="*80)
+    print("NORMALIZACIÓN A FORMATO LARGO")
+    print("="*80)
+    for r in resultados:
+        if r["estado"] == "ok":
+            print(f"  ✓ {r['salida']:<45} {r['filas']:>8} filas")
+        elif r["estado"] == "al_dia":
+            print(f"  = {r['salida']:<45} al día")
+        else:
+            print(f"  ✗ {r['salida']:<45} {r['error']}")
+    print(f"\nArchivos en: {os.path.abspath(FOLDERS['tidy'])}")
+    print("="*80)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Normaliza las descargas a Parquet en formato largo")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar aunque el Parquet esté al día")
+    parser.add_argument("--salidas", nargs="+", help="Solo estas salidas (dataset o variante de filtro)")
+    parser.add_argument("--verificar", action="store_true", help="Probar la normalización con tablas de ejemplo")
+    args = parser.parse_args()
+    
+    if args.verificar:
+        errores = check_layouts()
+        for error in errores:
+            print(f"  ✗ {error}")
+        print("✓ Formas de tabla reconocidas correctamente" if not errores else f"\n{len(errores)} forma(s) con errores")
+        return 1 if errores else 0
+    
+    resultados = process_latest(force=args.forzar, salidas=args.salidas)
+    print_results(resultados)
+    
+    return 1 if any(r["estado"] == "error" for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Limitador de peticiones adaptativo (token bucket) compartido por todos los workers
+Reduce la tasa cuando el servidor responde lento o con errores y la recupera cuando mejora
+"""
+
+import time
+import threading
+
+from config import RATE_LIMIT_CONFIG
+
+
+class AdaptiveRateLimiter:
+    """Token bucket thread-safe con ajuste AIMD de la tasa según latencia y errores"""
+    
+    def __init__(self, config=None):
+        """
+        Inicializa el limitador
+        
+        Args:
+            config (dict): Parámetros (por defecto RATE_LIMIT_CONFIG)
+        """
+        config = config or RATE_LIMIT_CONFIG
+        self.rate = config["requests_per_second"]
+        self.min_rate = config["min_requests_per_second"]
+        self.max_rate = config["max_requests_per_second"]
+        self.burst = config["burst"]
+        self.target_latency = config["target_latency"]
+        self.backoff_factor = config["backoff_factor"]
+        self.increase_step = config["increase_step"]
+        
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, ahora):
+        """Agrega los tokens generados desde la última consulta"""
+        self._tokens = min(self.burst, self._tokens + (ahora - self._last) * self.rate)
+        self._last = ahora
+    
+    def acquire(self):
+        """
+        Bloquea hasta que haya un token disponible
+        
+        Returns:
+            float: Segundos esperados
+        """
+        inicio = time.monotonic()
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._refill(ahora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return ahora - inicio
+                espera = (1 - self._tokens) / self.rate
+            time.sleep(espera)
+    
+    def record(self, duration, success=True):
+        """
+        Ajusta la tasa según el resultado de una petición
+        
+        Args:
+            duration (float): Segundos que tardó el servidor en responder
+            success (bool): False si la petición falló
+        """
+        with self._lock:
+            if not success or duration > self.target_latency:
+                # Retroceso multiplicativo ante errores o lentitud
+                self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                # Recuperación aditiva mientras el servidor responde bien
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
@@ -0,0 +1,154 @@
+"""
+Detección de página y tabla listas a partir de señales reales del navegador
+Sustituye las esperas fijas (time.sleep) por condiciones con tiempo máximo de respaldo
+"""
+
+import time
+
+from config import READINESS_CONFIG
+
+
+# Contador de peticiones XHR/fetch en curso (idempotente, se instala una vez por página)
+NETWORK_TRACKER_JS = """
+(function () {
+    if (window.__scraperRed) { return; }
+    var red = window.__scraperRed = {pendientes: 0};
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        red.pendientes++;
+        this.addEventListener('loadend', function () { red.pendientes--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetchOriginal = window.fetch;
+        window.fetch = function () {
+            red.pendientes++;
+            return fetchOriginal.apply(this, arguments).finally(function () { red.pendientes--; });
+        };
+    }
+})();
+"""
+
+# Observa mutaciones del contenedor de la tabla (cubre también el reemplazo de la tabla)
+TABLE_OBSERVER_JS = """
+var tabla = document.getElementById(arguments[0]);
+var contenedor = tabla && tabla.parentNode ? tabla.parentNode : document.body;
+if (window.__scraperObserver) { window.__scraperObserver.disconnect(); }
+window.__scraperMutaciones = 0;
+window.__scraperObserver = new MutationObserver(function (cambios) {
+    window.__scraperMutaciones += cambios.length;
+});
+window.__scraperObserver.observe(contenedor, {childList: true, subtree: true, characterData: true});
+"""
+
+PAGE_STATE_JS = """
+var tabla = document.getElementById(arguments[0]);
+var jq = (window.jQuery && window.jQuery.active) || 0;
+var red = window.__scraperRed ? window.__scraperRed.pendientes : 0;
+return {
+    listo: document.readyState === 'complete',
+    filas: tabla ? tabla.rows.length : -1,
+    mutaciones: window.__scraperMutaciones || 0,
+    pendientes: jq + red
+};
+"""
+
+
+def install_network_tracker(driver):
+    """
+    Instala en la página el contador de peticiones pendientes
+    
+    Args:
+        driver (webdriver): Driver con la página cargada
+    """
+    driver.execute_script(NETWORK_TRACKER_JS)
+
+
+def arm_table_observer(driver, table_id):
+    """
+    Empieza a contar mutaciones de la tabla; llamar justo antes de cambiar un filtro
+    
+    Args:
+        driver (webdriver): Driver con la página cargada
+        table_id (str): Atributo id de la tabla
+    """
+    install_network_tracker(driver)
+    driver.execute_script(TABLE_OBSERVER_JS, table_id)
+
+
+def _wait_until_stable(driver, table_id, require_mutation):
+    """
+    Espera a que la tabla tenga filas, no haya red pendiente y su estado no cambie
+    
+    Returns:
+        tuple: (segundos esperados, True si se cumplió la condición o False si
+        se alcanzó el tiempo máximo de respaldo)
+    """
+    inicio = time.monotonic()
+    limite = inicio + READINESS_CONFIG["timeout"]
+    limite_mutacion = inicio + READINESS_CONFIG["mutation_timeout"]
+    firma_previa = None
+    estable_desde = None
+    
+    while True:
+        estado = driver.execute_script(PAGE_STATE_JS, table_id) or {}
+        ahora = time.monotonic()
+        
+        if ahora >= limite:
+            return ahora - inicio, False
+        
+        # Si el filtro no produjo cambios en la tabla, se acepta tras mutation_timeout
+        mutada = (
+            not require_mutation
+            or estado.get("mutaciones", 0) > 0
+            or ahora >= limite_mutacion
+        )
+        lista = (
+            estado.get("listo")
+            and estado.get("pendientes", 0) == 0
+            and estado.get("filas", -1) > 0
+            and mutada
+        )
+        
+        if lista:
+            firma = (estado["filas"], estado["mutaciones"])
+            if firma != firma_previa:
+                firma_previa = firma
+                estable_desde = ahora
+            elif ahora - estable_desde >= READINESS_CONFIG["stable_for"]:
+                return ahora - inicio, True
+        else:
+            firma_previa = None
+        
+        time.sleep(READINESS_CONFIG["poll_interval"])
+
+
+def wait_page_ready(driver, table_id):
+    """
+    Espera a que la página cargada termine de renderizar la tabla
+    
+    Args:
+        driver (webdriver): Driver tras driver.get()
+        table_id (str): Atributo id de la tabla
+    
+    Returns:
+        tuple: (segundos esperados, True si la señal se cumplió)
+    """
+    install_network_tracker(driver)
+    return _wait_until_stable(driver, table_id, require_mutation=False)
+
+
+def wait_table_refresh(driver, table_id):
+    """
+    Espera a que la tabla se recargue tras el onchange de un filtro
+    
+    Requiere haber llamado a arm_table_observer() antes de cambiar el filtro.
+    
+    Args:
+        driver (webdriver): Driver con la página cargada
+        table_id (str): Atributo id de la tabla
+    
+    Returns:
+        tuple: (segundos esperados, True si la señal se cumplió)
+    """
+    return _wait_until_stable(driver, table_id, require_mutation=True)
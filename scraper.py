@@ -4,11 +4,15 @@ Automatiza la descarga de datos históricos y actuales de la Universidad Autóno
 """
 
 import os
+import re
+import sys
 import time
-import logging
+import shutil
+import tempfile
+import unicodedata
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-import glob
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,72 +22,86 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-from config import BASE_URL, DATASETS, SELENIUM_CONFIG, SELECTORS, FOLDERS
+from base_scraper import BaseScraper, RESULT_OK, RESULT_SKIPPED, RESULT_FAILED
+from downloads import DownloadWatcher
+from readiness import arm_table_observer, wait_page_ready, wait_table_refresh
+from tables import EXTRACT_TABLE_JS, rows_from_js, table_fingerprint, write_typed_table
+from config import (
+    SELENIUM_CONFIG, SELECTORS, FOLDERS, EXTRACTION_CONFIG, FILTER_CONFIG, PARALLEL_CONFIG, READINESS_CONFIG
+)
 
 
-class UabcScraper:
+# Página lista para procesar en el modo pestañas: milisegundos que tardó la
+# navegación según el propio navegador, o null si todavía no termina de cargar.
+# start_navigation marca el documento anterior con window.__uabcNav; mientras la
+# marca exista la navegación no se ha confirmado y la tabla sería la de la página vieja
+PAGE_LOADED_JS = """
+if (window.__uabcNav || document.readyState !== "complete" || !document.getElementById(arguments[0])) { return null; }
+var nav = performance.getEntriesByType("navigation")[0];
+return nav ? (nav.loadEventEnd || nav.domComplete) - nav.startTime : 0;
+"""
+
+# Opciones de cbNivel: [texto, seleccionada] (se lee recién cargada la página)
+FILTER_OPTIONS_JS = """
+var select = document.getElementById(arguments[0]);
+if (!select) { return null; }
+return Array.from(select.options).map(function (o) { return [o.text.trim(), o.selected]; });
+"""
+
+
+def filter_suffix(nombre, valor):
+    """
+    Genera el sufijo de archivo de una opción de filtro no declarada en DATASETS
+    
+    Args:
+        nombre (str): Nombre del dataset
+        valor (str): Texto de la opción (p. ej. "Área de conocimiento")
+        
+    Returns:
+        str: Sufijo, p. ej. "Programas_Licenciatura_AreaDeConocimiento"
+    """
+    ascii_text = unicodedata.normalize("NFKD", valor).encode("ascii", "ignore").decode()
+    palabras = re.findall(r"[A-Za-z0-9]+", ascii_text)
+    return f"{nombre}_{''.join(p[:1].upper() + p[1:] for p in palabras)}"
+
+
+class UabcScraper(BaseScraper):
     """Scraper para extraer datos de indicadores UABC"""
     
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, extract=False, resume=False, base_url=None):
         """
         Inicializa el scraper
         
         Args:
             headless (bool): Si es True, ejecuta el navegador sin interfaz gráfica
+            extract (bool): Si es True, lee la tabla con JavaScript y la guarda tipada en
+                FOLDERS["processed"] en lugar de descargar el Excel
+            resume (bool): Si es True, reanuda la última ejecución y omite lo ya completado
+            base_url (str): URL base alternativa (por ejemplo un servidor local de pruebas)
         """
-        self.base_url = BASE_URL
-        self.datasets = DATASETS
-        self.setup_logging()
-        self.setup_folders()
-        self.driver = self.setup_driver(headless)
+        super().__init__(resume)
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        self.headless = headless
+        self.extract = extract
         self.download_folder = os.path.abspath(FOLDERS["raw"])
+        self.driver = self.setup_driver(headless, self.download_folder)
         
-        self.stats = {
-            "total": len(DATASETS),
-            "exitosos": 0,
-            "fallidos": 0,
-            "inicio": datetime.now()
-        }
-        
-    def setup_folders(self):
-        """Crea las carpetas necesarias si no existen"""
-        for folder in FOLDERS.values():
-            Path(folder).mkdir(parents=True, exist_ok=True)
-        self.log_message("Carpetas creadas/verificadas", "INFO")
-    
-    def setup_logging(self):
-        """Configura el sistema de logging"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = f"{FOLDERS['logs']}/scraper_{timestamp}.log"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
-        self.logger.info("=" * 80)
-        self.logger.info("INICIANDO WEB SCRAPER - INDICADORES UABC")
-        self.logger.info("=" * 80)
-    
-    def log_message(self, message, level="INFO"):
-        """Registra un mensaje en el log"""
-        if level == "INFO":
-            self.logger.info(message)
-        elif level == "WARNING":
-            self.logger.warning(message)
-        elif level == "ERROR":
-            self.logger.error(message)
+        # URL que el modo pestañas ya cargó en la pestaña actual
+        self.preloaded_url = None
     
-    def setup_driver(self, headless=False):
+    @property
+    def fingerprint_mode(self):
+        """Modo de las huellas: el modo extract escribe CSV/Parquet y la exportación .xls"""
+        return "extract" if self.extract else "selenium"
+        
+    def setup_driver(self, headless=False, download_path=None):
         """
         Configura el WebDriver de Chrome
         
         Args:
             headless (bool): Ejecutar sin interfaz gráfica
+            download_path (str): Carpeta de descarga del navegador (por defecto FOLDERS["raw"])
             
         Returns:
             webdriver: Instancia del driver de Chrome
@@ -91,7 +109,7 @@ class UabcScraper:
         chrome_options = Options()
         
         # Configurar carpeta de descarga
-        download_path = os.path.abspath(FOLDERS["raw"])
+        download_path = os.path.abspath(download_path or FOLDERS["raw"])
         prefs = {
             "download.default_directory": download_path,
             "download.prompt_for_download": False,
@@ -110,9 +128,10 @@ class UabcScraper:
         
         # Inicializar driver
         try:
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.implicitly_wait(SELENIUM_CONFIG["implicit_wait"])
-            driver.set_page_load_timeout(SELENIUM_CONFIG["page_load_timeout"])
+            with self.span("inicio_driver"):
+                driver = webdriver.Chrome(options=chrome_options)
+                driver.implicitly_wait(SELENIUM_CONFIG["implicit_wait"])
+                driver.set_page_load_timeout(SELENIUM_CONFIG["page_load_timeout"])
             self.log_message("WebDriver de Chrome inicializado correctamente")
             return driver
         except Exception as e:
@@ -126,51 +145,146 @@ class UabcScraper:
         Returns:
             str: Path del archivo descargado o None
         """
-        download_folder = FOLDERS["raw"]
-        files = glob.glob(f"{download_folder}/*.xls*")
-        
-        if not files:
-            return None
-        
-        # Ordenar por fecha de modificación (más reciente primero)
-        latest_file = max(files, key=os.path.getmtime)
-        return latest_file
+        # Solo descargas crudas: el modo extract registra CSV/Parquet en processed
+        latest = self.catalog.latest(folder=FOLDERS["raw"])
+        if latest and not os.path.exists(latest["ruta"]):
+            # Se borraron archivos fuera del scraper: reconciliar y volver a consultar
+            self.catalog.sync_folder(FOLDERS["raw"])
+            latest = self.catalog.latest(folder=FOLDERS["raw"])
+        return latest["ruta"] if latest else None
     
-    def wait_for_download(self, timeout=60):
+    def wait_for_download(self, watcher, timeout=60):
         """
         Espera a que se complete la descarga
         
         Args:
+            watcher (DownloadWatcher): Watcher iniciado antes de hacer click
             timeout (int): Tiempo máximo de espera en segundos
             
         Returns:
-            bool: True si se completó la descarga, False si timeout
+            str: Ruta del archivo descargado o None si timeout
+        """
+        return watcher.wait(timeout)
+    
+    def load_page(self, url):
+        """
+        Navega a una URL respetando el limitador de peticiones compartido
+        
+        Args:
+            url (str): URL completa
+        """
+        with self.span("espera_limitador"):
+            self.rate_limiter.acquire()
+        inicio = time.monotonic()
+        try:
+            with self.span("carga_pagina"):
+                self.driver.get(url)
+        except Exception:
+            self.rate_limiter.record(time.monotonic() - inicio, success=False)
+            raise
+        self.rate_limiter.record(time.monotonic() - inicio)
+    
+    def log_wait(self, label, result):
+        """
+        Registra cuánto tardó realmente una espera de readiness
+        
+        Args:
+            label (str): Descripción de la espera
+            result (tuple): (segundos, señal cumplida) devuelto por readiness
+        """
+        segundos, cumplida = result
+        if cumplida:
+            self.log_message(f"{label} en {segundos:.2f} s", "DEBUG")
+        else:
+            self.log_message(f"{label}: se alcanzó el tiempo máximo ({segundos:.2f} s)", "WARNING")
+    
+    def set_download_folder(self, folder):
+        """
+        Redirige las descargas del navegador a otra carpeta vía CDP
+        
+        Args:
+            folder (str): Carpeta absoluta de destino
+        """
+        self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+            "behavior": "allow",
+            "downloadPath": folder,
+        })
+    
+    def download_table(self, boton_excel, output_name, table=None):
+        """
+        Descarga la tabla en una carpeta de staging propia y la mueve a FOLDERS["raw"]
+        
+        Cada descarga usa un directorio temporal vacío, así que el archivo nuevo
+        es el único que aparece ahí y no hace falta comparar el contenido de raw.
+        
+        Args:
+            boton_excel (WebElement): Botón que dispara exportTableToExcel
+            output_name (str): Prefijo del archivo final ({output_name}_{timestamp})
+            table (tuple): (headers, rows) de la tabla exportada, para el catálogo
+            
+        Returns:
+            str: Ruta final del archivo o None si la descarga no terminó
         """
-        download_folder = FOLDERS["raw"]
-        seconds = 0
+        staging = tempfile.mkdtemp(prefix=f"{output_name}_", dir=FOLDERS["staging"])
+        staging = os.path.abspath(staging)
         
-        # Esperar a que aparezca un archivo .xls o .xlsx
-        while seconds < timeout:
-            files = glob.glob(f"{download_folder}/*.xls*")
-            # Verificar que no haya archivos temporales de Chrome (.crdownload)
-            temp_files = glob.glob(f"{download_folder}/*.crdownload")
+        try:
+            self.set_download_folder(staging)
             
-            if files and not temp_files:
-                # Esperar un segundo adicional para asegurar que terminó
-                time.sleep(1)
-                return True
+            with self.span("descarga"), DownloadWatcher(staging) as watcher:
+                boton_excel.click()
+                downloaded_file = self.wait_for_download(watcher, SELENIUM_CONFIG["download_timeout"])
+            
+            if not downloaded_file:
+                return None
             
-            time.sleep(1)
-            seconds += 1
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extension = os.path.splitext(downloaded_file)[1]
+            new_filename = f"{FOLDERS['raw']}/{output_name}_{timestamp}{extension}"
+            
+            # Mismo sistema de archivos: el movimiento es atómico
+            os.replace(downloaded_file, new_filename)
+            
+            headers, rows = table or (None, None)
+            if headers is None:
+                self.add_output(new_filename)
+            else:
+                self.add_output(new_filename, len(rows), len(headers))
+            return new_filename
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def start_filter(self, filter_value):
+        """
+        Selecciona una opción de cbNivel en la pestaña actual sin esperar la recarga
+        
+        Args:
+            filter_value (str): Texto visible de la opción
+        """
+        wait = WebDriverWait(self.driver, 15)
+        
+        # Seleccionar el filtro
+        self.log_message(f"  Seleccionando filtro: {filter_value}", "DEBUG")
+        select_element = wait.until(
+            EC.presence_of_element_located((By.ID, SELECTORS["filtro"]))
+        )
         
-        return False
+        # Observar la tabla antes de cambiar el valor para detectar la recarga
+        arm_table_observer(self.driver, SELECTORS["tabla"])
+        
+        # El onchange pide los datos al servidor: cuenta como petición
+        with self.span("espera_limitador"):
+            self.rate_limiter.acquire()
+        
+        # Usar Select para cambiar el valor
+        Select(select_element).select_by_visible_text(filter_value)
     
-    def select_filter_and_download(self, filter_value, suffix):
+    def finish_filter(self, filter_value, suffix):
         """
-        Selecciona un filtro y descarga el archivo
+        Espera la recarga de la tabla tras start_filter() y la descarga o extrae
         
         Args:
-            filter_value (str): Valor del filtro a seleccionar
+            filter_value (str): Texto visible de la opción (para el log)
             suffix (str): Sufijo para el nombre del archivo
             
         Returns:
@@ -179,259 +293,532 @@ class UabcScraper:
         try:
             wait = WebDriverWait(self.driver, 15)
             
-            # Seleccionar el filtro
-            self.log_message(f"  Seleccionando filtro: {filter_value}")
-            select_element = wait.until(
-                EC.presence_of_element_located((By.ID, "cbNivel"))
-            )
-            
-            # Usar Select para cambiar el valor
-            select = Select(select_element)
-            select.select_by_visible_text(filter_value)
-            
             # Esperar a que se recarguen los datos (la función onchange)
-            self.log_message("  Esperando recarga de datos...")
-            time.sleep(3)
+            self.log_message(f"  Esperando recarga de datos ({filter_value})...", "DEBUG")
+            with self.span("recarga_filtro"):
+                wait.until(EC.presence_of_element_located((By.ID, SELECTORS["tabla"])))
+                resultado = wait_table_refresh(self.driver, SELECTORS["tabla"])
+            self.rate_limiter.record(*resultado)
+            self.log_wait("  Tabla recargada", resultado)
             
-            # Esperar a que la tabla se actualice
-            wait.until(EC.presence_of_element_located((By.ID, SELECTORS["tabla"])))
-            time.sleep(2)
+            headers, rows = self.read_table()
             
-            # Buscar botón de exportar
-            boton_excel = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, SELECTORS["boton_excel"]))
-            )
+            # Cada variante lleva su propia huella: puede cambiar aunque la vista por defecto no
+            fingerprint = table_fingerprint(headers, rows) if headers is not None else None
+            if self.is_unchanged(suffix, fingerprint):
+                self.journal.record(suffix, RESULT_SKIPPED)
+                return True
             
-            # Contar archivos antes
-            files_before = set(glob.glob(f"{FOLDERS['raw']}/*.xls*"))
+            if self.extract:
+                self.log_message("  Extrayendo tabla...", "DEBUG")
+                new_filename = self.save_table(suffix, headers, rows)
+            else:
+                # Buscar botón de exportar
+                boton_excel = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, SELECTORS["boton_excel"]))
+                )
+                
+                self.log_message("  Descargando archivo...", "DEBUG")
+                new_filename = self.download_table(boton_excel, suffix, (headers, rows))
             
-            self.log_message("  Descargando archivo...")
-            boton_excel.click()
+            if new_filename:
+                file_size = os.path.getsize(new_filename) / 1024
+                self.log_message(f"  ✓ Descarga exitosa: {os.path.basename(new_filename)}")
+                self.log_message(f"    Tamaño: {file_size:.2f} KB")
+                self.journal.record(suffix, RESULT_OK, [new_filename])
+                self.save_fingerprint(suffix, fingerprint, [new_filename])
+                return True
             
-            # Esperar descarga
-            if self.wait_for_download(SELENIUM_CONFIG["download_timeout"]):
-                files_after = set(glob.glob(f"{FOLDERS['raw']}/*.xls*"))
-                new_files = files_after - files_before
-                
-                if new_files:
-                    downloaded_file = list(new_files)[0]
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    extension = os.path.splitext(downloaded_file)[1]
-                    new_filename = f"{FOLDERS['raw']}/{suffix}_{timestamp}{extension}"
-                    
-                    os.rename(downloaded_file, new_filename)
-                    
-                    file_size = os.path.getsize(new_filename) / 1024
-                    self.log_message(f"  ✓ Descarga exitosa: {os.path.basename(new_filename)}")
-                    self.log_message(f"    Tamaño: {file_size:.2f} KB")
-                    return True
-                    
+            self.log_message("  No se obtuvo el archivo del filtro", "WARNING")
+            self.journal.record(suffix, RESULT_FAILED)
             return False
             
         except Exception as e:
             self.log_message(f"  Error en filtro {filter_value}: {e}", "ERROR")
+            self.journal.record(suffix, RESULT_FAILED, error=str(e))
             return False
     
-    def scrape_dataset(self, dataset):
+    def select_filter_and_download(self, filter_value, suffix):
         """
-        Extrae un dataset específico
+        Selecciona un filtro y descarga el archivo
         
         Args:
-            dataset (dict): Diccionario con la información del dataset
+            filter_value (str): Valor del filtro a seleccionar
+            suffix (str): Sufijo para el nombre del archivo
             
         Returns:
             bool: True si fue exitoso, False si falló
         """
+        if self.journal.is_done(suffix):
+            self.log_message(f"  {suffix} ya se completó en esta ejecución, se omite")
+            return True
+        
+        try:
+            self.start_filter(filter_value)
+        except Exception as e:
+            self.log_message(f"  Error en filtro {filter_value}: {e}", "ERROR")
+            self.journal.record(suffix, RESULT_FAILED, error=str(e))
+            return False
+        
+        return self.finish_filter(filter_value, suffix)
+    
+    def filter_variants(self, dataset):
+        """
+        Obtiene las variantes de filtro a exportar de un dataset
+        
+        Parte de las declaradas en DATASETS ("filtros") y, si FILTER_CONFIG["discover"]
+        está activo, agrega las opciones de cbNivel de la página que no estén declaradas
+        (excepto la opción seleccionada por defecto y las de FILTER_CONFIG["exclude"])
+        y las registra en el catálogo.
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset (página ya cargada)
+            
+        Returns:
+            list: Variantes [{"valor", "sufijo"}]
+        """
+        variantes = list(dataset.get("filtros") or [])
+        if not FILTER_CONFIG["discover"]:
+            return variantes
+        
+        try:
+            opciones = self.driver.execute_script(FILTER_OPTIONS_JS, SELECTORS["filtro"])
+        except Exception as e:
+            self.log_message(f"No se pudieron leer las opciones de {SELECTORS['filtro']}: {e}", "WARNING")
+            return variantes
+        
+        declaradas = {v["valor"] for v in variantes}
+        descubiertas = []
+        for texto, por_defecto in opciones or []:
+            if not texto or por_defecto or texto in declaradas or texto in FILTER_CONFIG["exclude"]:
+                continue
+            sufijo = filter_suffix(dataset["nombre"], texto)
+            self.log_message(f"Opción nueva en {SELECTORS['filtro']}: '{texto}' → {sufijo}")
+            descubiertas.append({"valor": texto, "sufijo": sufijo})
+        
+        # La cobertura del validador espera también las variantes descubiertas
+        if descubiertas:
+            self.catalog.record_variants(dataset["nombre"], descubiertas)
+        return variantes + descubiertas
+    
+    def download_variants(self, dataset, variantes):
+        """
+        Descarga las variantes de filtro de un dataset, en serie o en varias pestañas
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset (página ya cargada)
+            variantes (list): Variantes [{"valor", "sufijo"}]
+            
+        Returns:
+            int: Número de variantes descargadas correctamente
+        """
+        tabs = FILTER_CONFIG["tabs"]
+        if tabs <= 1 or len(variantes) <= 1:
+            success_count = 0
+            for variante in variantes:
+                if self.select_filter_and_download(variante["valor"], variante["sufijo"]):
+                    success_count += 1
+            return success_count
+        
+        success_count = 0
+        for i in range(0, len(variantes), tabs):
+            success_count += self.download_variants_in_tabs(dataset, variantes[i:i + tabs])
+        return success_count
+    
+    def download_variants_in_tabs(self, dataset, variantes):
+        """
+        Descarga un lote de variantes en pestañas simultáneas
+        
+        La pestaña actual conserva la página ya cargada y las demás se abren con
+        window.open, de modo que cargan en paralelo. Primero se selecciona el
+        filtro en todas las pestañas y después se recoge cada una, así las
+        recargas de la tabla se solapan en el servidor. Las descargas se hacen
+        una por una porque la carpeta de descarga es global al navegador.
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+            variantes (list): Variantes del lote (como máximo FILTER_CONFIG["tabs"])
+            
+        Returns:
+            int: Número de variantes descargadas correctamente
+        """
+        success_count = 0
+        pendientes = []
+        for variante in variantes:
+            if self.journal.is_done(variante["sufijo"]):
+                self.log_message(f"  {variante['sufijo']} ya se completó en esta ejecución, se omite")
+                success_count += 1
+            else:
+                pendientes.append(variante)
+        
+        if not pendientes:
+            return success_count
+        
+        principal = self.driver.current_window_handle
+        previas = set(self.driver.window_handles)
+        
+        # Abrir el resto de pestañas sin bloquear: las páginas cargan en paralelo
+        for _ in pendientes[1:]:
+            with self.span("espera_limitador"):
+                self.rate_limiter.acquire()
+            self.driver.execute_script("window.open(arguments[0], '_blank');", self.base_url + dataset["url"])
+        nuevas = [h for h in self.driver.window_handles if h not in previas]
+        self.log_message(f"  {len(pendientes)} filtro(s) en {len(nuevas) + 1} pestaña(s)")
+        
+        iniciadas = []
+        try:
+            # 1. Seleccionar el filtro en cada pestaña (la recarga sigue en segundo plano)
+            for handle, variante in zip([principal] + nuevas, pendientes):
+                self.driver.switch_to.window(handle)
+                try:
+                    if handle != principal:
+                        with self.span("espera_tabla"):
+                            WebDriverWait(self.driver, 15).until(
+                                EC.presence_of_element_located((By.ID, SELECTORS["tabla"]))
+                            )
+                            wait_page_ready(self.driver, SELECTORS["tabla"])
+                    self.start_filter(variante["valor"])
+                    iniciadas.append((handle, variante))
+                except Exception as e:
+                    self.log_message(f"  Error en filtro {variante['valor']}: {e}", "ERROR")
+                    self.journal.record(variante["sufijo"], RESULT_FAILED, error=str(e))
+            
+            # 2. Recoger cada pestaña: esperar su recarga y descargar
+            for handle, variante in iniciadas:
+                self.driver.switch_to.window(handle)
+                if self.finish_filter(variante["valor"], variante["sufijo"]):
+                    success_count += 1
+        finally:
+            for handle in nuevas:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception:
+                    pass
+            self.driver.switch_to.window(principal)
+        
+        return success_count
+    
+    def extract_dataset(self, dataset):
+        """
+        Realiza un intento de extracción de un dataset
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+            
+        Returns:
+            str: RESULT_OK, RESULT_SKIPPED o RESULT_FAILED
+        """
         nombre = dataset["nombre"]
         url = dataset["url"]
         full_url = self.base_url + url
         
-        self.log_message(f"\n{'='*60}")
         self.log_message(f"Extrayendo: {nombre}")
-        self.log_message(f"URL: {full_url}")
-        self.log_message(f"Descripción: {dataset['descripcion']}")
+        self.log_message(f"URL: {full_url}", "DEBUG")
+        self.log_message(f"Descripción: {dataset['descripcion']}", "DEBUG")
         
         try:
-            # 1. Navegar a la URL
-            self.driver.get(full_url)
-            self.log_message("Página cargada correctamente")
-            time.sleep(2)
+            # 1. Navegar a la URL (en modo pestañas ya se cargó en segundo plano)
+            if self.preloaded_url == full_url:
+                self.preloaded_url = None
+                self.log_message("Página precargada en su pestaña", "DEBUG")
+            else:
+                self.load_page(full_url)
+                self.log_message("Página cargada correctamente", "DEBUG")
             
-            # 2. Esperar a que la tabla esté presente
+            # 2. Esperar a que la tabla esté presente y termine de renderizar
             wait = WebDriverWait(self.driver, 15)
-            tabla = wait.until(
-                EC.presence_of_element_located((By.ID, SELECTORS["tabla"]))
-            )
-            self.log_message(f"Tabla '{SELECTORS['tabla']}' encontrada")
+            with self.span("espera_tabla"):
+                wait.until(
+                    EC.presence_of_element_located((By.ID, SELECTORS["tabla"]))
+                )
+                self.log_message(f"Tabla '{SELECTORS['tabla']}' encontrada", "DEBUG")
+                self.log_wait("Tabla lista", wait_page_ready(self.driver, SELECTORS["tabla"]))
             
-            # ===== CASOS ESPECIALES CON FILTROS =====
+            # 3. Omitir la exportación si el contenido no cambió desde la última vez
+            #    (los datasets con filtros se comparan por variante en finish_filter)
+            headers, rows = self.read_table()
+            fingerprint = table_fingerprint(headers, rows) if headers is not None else None
+            if "filtros" not in dataset and self.is_unchanged(nombre, fingerprint):
+                return RESULT_SKIPPED
             
-            # CASO 1: Programas educativos de licenciatura
-            if nombre == "Programas_Licenciatura":
-                self.log_message("Dataset con filtros múltiples detectado")
-                success_count = 0
-                
-                # Descargar por Unidad académica
-                if self.select_filter_and_download("Unidad académica", "Programas_Lic_UnidadAcademica"):
-                    success_count += 1
-                
-                time.sleep(2)
-                
-                # Descargar por Área de conocimiento
-                if self.select_filter_and_download("Área de conocimiento", "Programas_Lic_AreaConocimiento"):
-                    success_count += 1
-                
-                if success_count == 2:
-                    self.stats["exitosos"] += 1
-                    return True
-                else:
-                    self.log_message(f"Solo se descargaron {success_count}/2 archivos", "WARNING")
-                    self.stats["fallidos"] += 1
-                    return False
-            
-            # CASO 2: Relación alumnos por profesor
-            elif nombre == "Relacion_Alumnos_Profesor":
-                self.log_message("Dataset con filtro detectado")
-                
-                # Descargar por Unidad académica
-                if self.select_filter_and_download("Unidad académica", "Relacion_AlumnosProfesor_UnidadAcademica"):
-                    self.stats["exitosos"] += 1
-                    return True
-                else:
-                    self.stats["fallidos"] += 1
-                    return False
-            
-            # CASO 3: Cuerpos académicos
-            elif nombre == "Cuerpos_Academicos":
-                self.log_message("Dataset con filtros múltiples detectado")
-                success_count = 0
-                
-                # Descargar por Unidad académica
-                if self.select_filter_and_download("Unidad académica", "CuerposAcademicos_UnidadAcademica"):
-                    success_count += 1
-                
-                time.sleep(2)
-                
-                # Descargar por Área de conocimiento
-                if self.select_filter_and_download("Área de conocimiento", "CuerposAcademicos_AreaConocimiento"):
-                    success_count += 1
-                
-                if success_count == 2:
-                    self.stats["exitosos"] += 1
-                    return True
-                else:
-                    self.log_message(f"Solo se descargaron {success_count}/2 archivos", "WARNING")
-                    self.stats["fallidos"] += 1
-                    return False
-            
-            # ===== CASO NORMAL (sin filtros) =====
-            else:
-                # 3. Buscar y hacer click en el botón de exportar
-                boton_excel = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, SELECTORS["boton_excel"]))
-                )
-                
-                # Contar archivos antes de la descarga
-                files_before = set(glob.glob(f"{FOLDERS['raw']}/*.xls*"))
-                
-                self.log_message("Haciendo click en botón de exportar...")
-                boton_excel.click()
-                
-                # 4. Esperar a que se complete la descarga
-                self.log_message("Esperando descarga...")
-                if self.wait_for_download(SELENIUM_CONFIG["download_timeout"]):
-                    # Obtener archivo recién descargado
-                    files_after = set(glob.glob(f"{FOLDERS['raw']}/*.xls*"))
-                    new_files = files_after - files_before
-                    
-                    if new_files:
-                        downloaded_file = list(new_files)[0]
-                        
-                        # Renombrar archivo con nombre descriptivo
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        extension = os.path.splitext(downloaded_file)[1]
-                        new_filename = f"{FOLDERS['raw']}/{nombre}_{timestamp}{extension}"
-                        
-                        os.rename(downloaded_file, new_filename)
-                        
-                        file_size = os.path.getsize(new_filename) / 1024  # KB
-                        self.log_message(f"✓ Descarga exitosa: {os.path.basename(new_filename)}")
-                        self.log_message(f"  Tamaño: {file_size:.2f} KB")
-                        
-                        self.stats["exitosos"] += 1
-                        return True
-                    else:
-                        self.log_message("No se detectó archivo nuevo descargado", "WARNING")
-                        self.stats["fallidos"] += 1
-                        return False
-                else:
-                    self.log_message("Timeout esperando descarga", "ERROR")
-                    self.stats["fallidos"] += 1
-                    return False
+            # 4. Exportar (con o sin filtros)
+            if not self.export_dataset(dataset, wait, (headers, rows)):
+                return RESULT_FAILED
+            
+            if "filtros" in dataset:
+                # Todas las variantes sin cambios: no se escribió ningún archivo
+                return RESULT_OK if self.outputs else RESULT_SKIPPED
+            
+            self.save_fingerprint(nombre, fingerprint, self.outputs)
+            return RESULT_OK
             
         except TimeoutException:
             self.log_message(f"Timeout: No se pudo cargar el elemento en {nombre}", "ERROR")
-            self.stats["fallidos"] += 1
-            return False
+            return RESULT_FAILED
         except NoSuchElementException as e:
             self.log_message(f"Elemento no encontrado en {nombre}: {e}", "ERROR")
-            self.stats["fallidos"] += 1
-            return False
+            return RESULT_FAILED
         except Exception as e:
             self.log_message(f"Error inesperado en {nombre}: {e}", "ERROR")
-            self.stats["fallidos"] += 1
+            return RESULT_FAILED
+    
+    def read_table(self):
+        """
+        Lee la tabla de la página actual con una sola llamada a JavaScript
+        
+        Returns:
+            tuple: (headers, rows) o (None, None) si la tabla no existe
+        """
+        with self.span("lectura_tabla"):
+            return rows_from_js(
+                self.driver.execute_script(EXTRACT_TABLE_JS, SELECTORS["tabla"])
+            )
+    
+    def save_table(self, output_name, headers, rows):
+        """
+        Guarda una tabla ya extraída como archivo tipado en FOLDERS["processed"]
+        
+        Args:
+            output_name (str): Prefijo del archivo ({output_name}_{timestamp})
+            headers (list): Encabezados de la tabla
+            rows (list): Filas de la tabla
+            
+        Returns:
+            str: Ruta del archivo escrito o None si la tabla no existe
+        """
+        if headers is None:
+            self.log_message(f"Tabla '{SELECTORS['tabla']}' no encontrada", "ERROR")
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with self.span("escritura"):
+            new_filename = write_typed_table(
+                f"{FOLDERS['processed']}/{output_name}_{timestamp}",
+                headers, rows, EXTRACTION_CONFIG["format"]
+            )
+        self.add_output(new_filename, len(rows), len(headers))
+        return new_filename
+    
+    def export_dataset(self, dataset, wait, table=None):
+        """
+        Exporta el dataset de la página ya cargada
+        
+        Args:
+            dataset (dict): Diccionario con la información del dataset
+            wait (WebDriverWait): Espera configurada para el driver
+            table (tuple): (headers, rows) ya leídos de la página, para el modo extract
+            
+        Returns:
+            bool: True si se descargaron todos los archivos del dataset
+        """
+        nombre = dataset["nombre"]
+        
+        # ===== DATASETS CON FILTROS (un archivo por opción de cbNivel) =====
+        if "filtros" in dataset:
+            variantes = self.filter_variants(dataset)
+            if not variantes:
+                self.log_message(f"No hay opciones de {SELECTORS['filtro']} para exportar", "ERROR")
+                return False
+            
+            self.log_message(f"Dataset con {len(variantes)} filtro(s) detectado")
+            success_count = self.download_variants(dataset, variantes)
+            
+            if success_count == len(variantes):
+                return True
+            else:
+                self.log_message(f"Solo se descargaron {success_count}/{len(variantes)} archivos", "WARNING")
+                return False
+        
+        # ===== CASO NORMAL (sin filtros) =====
+        elif self.extract:
+            headers, rows = table if table else self.read_table()
+            new_filename = self.save_table(nombre, headers, rows)
+            
+            if new_filename:
+                self.log_message(f"✓ Extracción exitosa: {os.path.basename(new_filename)}")
+                self.log_message(f"  Filas: {len(rows)} | Columnas: {len(headers)}")
+                return True
             return False
-        finally:
-            # Delay entre peticiones para no sobrecargar el servidor
-            time.sleep(SELENIUM_CONFIG["delay_between_requests"])
+        else:
+            # Buscar y hacer click en el botón de exportar
+            boton_excel = wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, SELECTORS["boton_excel"]))
+            )
+            
+            self.log_message("Haciendo click en botón de exportar...", "DEBUG")
+            
+            # Descargar en staging y renombrar con nombre descriptivo
+            self.log_message("Esperando descarga...", "DEBUG")
+            new_filename = self.download_table(boton_excel, nombre, table)
+            
+            if new_filename:
+                file_size = os.path.getsize(new_filename) / 1024  # KB
+                self.log_message(f"✓ Descarga exitosa: {os.path.basename(new_filename)}")
+                self.log_message(f"  Tamaño: {file_size:.2f} KB")
+                return True
+            else:
+                self.log_message("Timeout esperando descarga", "ERROR")
+                return False
     
-    def scrape_all(self):
-        """Extrae todos los datasets configurados"""
-        self.log_message(f"\nIniciando extracción de {len(self.datasets)} datasets...")
+    def scrape_datasets(self, datasets, workers=None, tabs=None):
+        """
+        Extrae una lista de datasets con un pool de navegadores o con pestañas de un solo navegador
+        
+        Args:
+            datasets (list): Datasets a extraer
+            workers (int): Sesiones de Chrome en paralelo (por defecto PARALLEL_CONFIG["workers"])
+            tabs (int): Pestañas del mismo Chrome (por defecto PARALLEL_CONFIG["tabs"]);
+                solo se usa con un worker
+        """
+        if workers is None:
+            workers = PARALLEL_CONFIG["workers"]
+        if tabs is None:
+            tabs = PARALLEL_CONFIG["tabs"]
         
-        for i, dataset in enumerate(self.datasets, 1):
-            self.log_message(f"\n[{i}/{len(self.datasets)}] Procesando...")
-            self.scrape_dataset(dataset)
+        if tabs > 1 and workers > 1:
+            self.log_message("Con varios workers no se usan pestañas; cada worker usa una", "WARNING")
+        elif tabs > 1 and len(datasets) > 1:
+            return self.scrape_datasets_in_tabs(datasets, tabs)
         
-        self.print_summary()
+        return super().scrape_datasets(datasets, workers)
     
-    def scrape_priority(self, priority=1):
+    def start_navigation(self, url):
         """
-        Extrae solo los datasets con prioridad específica
+        Inicia la carga de una URL en la pestaña actual sin esperar a que termine
+        
+        Marca el documento actual con window.__uabcNav para que PAGE_LOADED_JS
+        no confunda la página anterior con la nueva antes de que cambie.
         
         Args:
-            priority (int): Nivel de prioridad (1 = más importante)
+            url (str): URL completa
+        """
+        with self.span("espera_limitador"):
+            self.rate_limiter.acquire()
+        self.driver.execute_script("window.__uabcNav = true; window.location.href = arguments[0];", url)
+    
+    def scrape_datasets_in_tabs(self, datasets, tabs):
         """
-        datasets_filtered = [d for d in self.datasets if d.get("prioridad") == priority]
+        Extrae datasets intercalándolos en varias pestañas de un solo Chrome
         
-        self.log_message(f"\nExtrayendo {len(datasets_filtered)} datasets con prioridad {priority}...")
+        Cada pestaña empieza a cargar su dataset sin bloquear; el dataset cuya
+        página esté lista primero se procesa completo (tabla, filtros, descarga)
+        mientras las demás siguen cargando, y su pestaña recibe el siguiente
+        dataset pendiente. Las descargas pasan por la carpeta de staging propia
+        de cada descarga, así que no se mezclan entre pestañas.
         
-        for i, dataset in enumerate(datasets_filtered, 1):
-            self.log_message(f"\n[{i}/{len(datasets_filtered)}] Procesando...")
-            self.scrape_dataset(dataset)
+        Args:
+            datasets (list): Datasets a extraer
+            tabs (int): Número de pestañas
+        """
+        tabs = min(tabs, len(datasets), PARALLEL_CONFIG["max_workers_per_host"])
+        self.log_message(f"Modo pestañas: {tabs} pestañas en un solo navegador")
         
-        self.print_summary()
+        pendientes = deque(datasets)
+        principal = self.driver.current_window_handle
+        nuevas = []
+        en_curso = {}  # handle -> (dataset, url, inicio)
+        tiempos = {}  # handle -> segundos de carga medidos en la página
+        
+        def asignar(handle):
+            # Carga en la pestaña el siguiente dataset que no esté completo
+            while pendientes:
+                dataset = pendientes.popleft()
+                if self.journal.is_done(dataset["nombre"]):
+                    self.scrape_dataset(dataset)
+                    continue
+                
+                url = self.base_url + dataset["url"]
+                self.driver.switch_to.window(handle)
+                try:
+                    self.start_navigation(url)
+                except Exception as e:
+                    self.log_message(f"No se pudo iniciar la carga de {dataset['nombre']}: {e}", "WARNING")
+                    url = None
+                en_curso[handle] = (dataset, url, time.monotonic())
+                return
+        
+        try:
+            for _ in range(tabs - 1):
+                self.driver.switch_to.new_window("tab")
+                nuevas.append(self.driver.current_window_handle)
+            
+            for handle in [principal] + nuevas:
+                asignar(handle)
+            
+            while en_curso:
+                listo = None
+                for handle, (dataset, url, inicio) in en_curso.items():
+                    vencido = time.monotonic() - inicio > SELENIUM_CONFIG["page_load_timeout"]
+                    if url is None or vencido:
+                        listo = handle
+                        break
+                    self.driver.switch_to.window(handle)
+                    try:
+                        milisegundos = self.driver.execute_script(PAGE_LOADED_JS, SELECTORS["tabla"])
+                    except Exception:
+                        # La pestaña sigue navegando
+                        milisegundos = None
+                    if milisegundos is not None:
+                        tiempos[handle] = milisegundos / 1000
+                        listo = handle
+                        break
+                
+                if listo is None:
+                    time.sleep(READINESS_CONFIG["poll_interval"])
+                    continue
+                
+                dataset, url, inicio = en_curso.pop(listo)
+                self.driver.switch_to.window(listo)
+                if url is not None:
+                    # La pestaña pudo quedar lista mucho antes de que le tocara el
+                    # turno; solo la carga medida por el navegador cuenta como latencia
+                    duracion = tiempos.pop(listo, None)
+                    if duracion is not None:
+                        self.rate_limiter.record(duracion)
+                        self.metrics.record("carga_pagina", duracion, dataset["nombre"])
+                    # Si la página no llegó a cargar, extract_dataset la vuelve a pedir
+                    self.preloaded_url = url
+                
+                self.log_message(f"\n[{len(datasets) - len(pendientes) - len(en_curso)}/{len(datasets)}] Procesando...")
+                self.scrape_dataset(dataset)
+                self.preloaded_url = None
+                
+                asignar(listo)
+        finally:
+            for handle in nuevas:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception:
+                    pass
+            self.driver.switch_to.window(principal)
     
-    def print_summary(self):
-        """Imprime resumen de la ejecución"""
-        duracion = datetime.now() - self.stats["inicio"]
-        
-        self.log_message("\n" + "="*80)
-        self.log_message("RESUMEN DE EJECUCIÓN")
-        self.log_message("="*80)
-        self.log_message(f"Total de datasets: {self.stats['total']}")
-        self.log_message(f"Exitosos: {self.stats['exitosos']} ✓")
-        self.log_message(f"Fallidos: {self.stats['fallidos']} ✗")
-        self.log_message(f"Tasa de éxito: {(self.stats['exitosos']/self.stats['total']*100):.1f}%")
-        self.log_message(f"Duración: {duracion}")
-        self.log_message(f"Archivos guardados en: {os.path.abspath(FOLDERS['raw'])}")
-        self.log_message("="*80)
+    def spawn_worker(self, worker_id):
+        """
+        Crea un worker con su propia sesión de Chrome y carpeta de descarga
+        
+        Args:
+            worker_id (int): Identificador del worker
+            
+        Returns:
+            UabcScraper: Scraper independiente listo para extraer datasets
+        """
+        worker = super().spawn_worker(worker_id)
+        worker.download_folder = os.path.abspath(
+            os.path.join(FOLDERS["staging"], f"worker_{worker_id}")
+        )
+        Path(worker.download_folder).mkdir(parents=True, exist_ok=True)
+        worker.driver = None
+        worker.driver = worker.setup_driver(self.headless, worker.download_folder)
+        return worker
     
     def close(self):
         """Cierra el WebDriver y limpia recursos"""
         if self.driver:
             self.driver.quit()
             self.log_message("WebDriver cerrado correctamente")
+        super().close()
 
 
 def main():
@@ -444,6 +831,7 @@ def main():
     print("2. Extraer solo datasets PRIORITARIOS (prioridad 1)")
     print("3. Extraer datasets de PRIORIDAD 2")
     print("4. Salir")
+    print("\n(Sin menú, para automatizar: python cli.py scrape --help)")
     
     opcion = input("\nSelecciona una opción (1-4): ").strip()
     
@@ -454,9 +842,12 @@ def main():
     headless_input = input("\n¿Ejecutar en modo headless (sin ventana)? (s/n): ").strip().lower()
     headless = headless_input == "s"
     
+    # Con --resume se continúa la última ejecución de la bitácora
+    resume = "--resume" in sys.argv
+    
     scraper = None
     try:
-        scraper = UabcScraper(headless=headless)
+        scraper = UabcScraper(headless=headless, resume=resume)
         
         if opcion == "1":
             scraper.scrape_all()
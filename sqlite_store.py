@@ -0,0 +1,36 @@
+"""
+Base común de los almacenes SQLite (catálogo, historial y almacén histórico)
+Una sola conexión en modo WAL compartida por los hilos de trabajo y protegida por un lock
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Conexión SQLite compartida entre hilos con el esquema ya creado"""
+    
+    def __init__(self, path, schema):
+        """
+        Abre (o crea) la base y aplica el esquema
+        
+        Args:
+            path (str): Ruta de la base SQLite
+            schema (str): Sentencias CREATE ... IF NOT EXISTS del almacén
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(schema)
+    
+    def close(self):
+        """Cierra la conexión"""
+        self._conn.close()
+    
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
@@ -0,0 +1,396 @@
+"""
+Utilidades para leer y escribir la tabla de datos (tblData) de los indicadores UABC
+Permite trabajar con el HTML de la página sin pasar por el navegador
+"""
+
+import os
+import re
+import json
+import html
+import hashlib
+from html.parser import HTMLParser
+
+
+# Devuelve las filas de la tabla como [[celdas], es_encabezado] en una sola llamada
+EXTRACT_TABLE_JS = """
+var tabla = document.getElementById(arguments[0]);
+if (!tabla) { return null; }
+var filas = [];
+for (var i = 0; i < tabla.rows.length; i++) {
+    var fila = tabla.rows[i];
+    var celdas = [];
+    var encabezado = true;
+    for (var j = 0; j < fila.cells.length; j++) {
+        celdas.push(fila.cells[j].innerText);
+        if (fila.cells[j].tagName === 'TD') { encabezado = false; }
+    }
+    if (celdas.length) { filas.push([celdas, encabezado]); }
+}
+return filas;
+"""
+
+
+class TableParser(HTMLParser):
+    """Parser HTML que extrae las filas de una tabla identificada por su id"""
+    
+    def __init__(self, table_id=None):
+        """
+        Inicializa el parser
+        
+        Args:
+            table_id (str): Atributo id de la tabla a extraer (None = primera tabla)
+        """
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.rows = []
+        self.found = False
+        self._finished = False
+        self._depth = 0  # Profundidad de tablas anidadas dentro de la tabla objetivo
+        self._row = None
+        self._cell = None
+        self._header_row = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif not self._finished and self.table_id in (None, dict(attrs).get("id")):
+                self.found = True
+                self._depth = 1
+            return
+        
+        if self._depth != 1:
+            return
+        
+        if tag == "tr":
+            self._row = []
+            self._header_row = True
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+            if tag == "td":
+                self._header_row = False
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+    
+    def handle_endtag(self, tag):
+        if tag == "table" and self._depth:
+            self._depth -= 1
+            self._finished = self._depth == 0
+            return
+        
+        if self._depth != 1:
+            return
+        
+        if tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._row:
+                self.handle_row(self._row, self._header_row)
+            self._row = None
+    
+    def handle_data(self, data):
+        if self._depth == 1 and self._cell is not None:
+            self._cell.append(data)
+    
+    def handle_row(self, cells, is_header):
+        """
+        Procesa una fila completa de la tabla
+        
+        Args:
+            cells (list): Texto normalizado de cada celda
+            is_header (bool): True si todas las celdas de la fila son <th>
+        """
+        self.rows.append((cells, is_header))
+
+
+class TableStats(TableParser):
+    """Variante de TableParser que solo guarda encabezados y cuenta filas (memoria constante)"""
+    
+    def __init__(self, table_id=None):
+        super().__init__(table_id)
+        self.headers = None
+        self.row_count = 0
+    
+    def handle_row(self, cells, is_header):
+        # Igual que split_header: la primera fila hace de encabezado
+        if self.headers is None:
+            self.headers = cells
+        else:
+            self.row_count += 1
+
+
+def scan_table_file(filepath, table_id=None, chunk_size=64 * 1024):
+    """
+    Recorre un archivo HTML por bloques obteniendo encabezados y número de filas
+    
+    Sirve para los .xls que genera exportTableToExcel, que en realidad son HTML.
+    
+    Args:
+        filepath (str): Ruta del archivo
+        table_id (str): Atributo id de la tabla (None = primera tabla)
+        chunk_size (int): Tamaño de cada bloque leído
+        
+    Returns:
+        tuple: (headers, row_count) o (None, 0) si no hay tabla
+    """
+    parser = TableStats(table_id)
+    with open(filepath, encoding="utf-8", errors="replace") as f:
+        for bloque in iter(lambda: f.read(chunk_size), ""):
+            parser.feed(bloque)
+            if parser._finished:
+                break
+    parser.close()
+    return parser.headers, parser.row_count
+
+
+def parse_table(page_html, table_id):
+    """
+    Extrae encabezados y filas de una tabla HTML
+    
+    Args:
+        page_html (str): HTML completo de la página
+        table_id (str): Atributo id de la tabla
+    
+    Returns:
+        tuple: (headers, rows) o (None, None) si la tabla no existe
+    """
+    parser = TableParser(table_id)
+    parser.feed(page_html)
+    parser.close()
+    
+    if not parser.found:
+        return None, None
+    
+    return split_header(parser.rows)
+
+
+def split_header(parsed_rows):
+    """
+    Separa la fila de encabezados del resto de la tabla
+    
+    Args:
+        parsed_rows (list): Pares (celdas, es_encabezado) en orden de aparición
+    
+    Returns:
+        tuple: (headers, rows)
+    """
+    headers = []
+    rows = []
+    for cells, is_header in parsed_rows:
+        if is_header and not rows and not headers:
+            headers = cells
+        else:
+            rows.append(cells)
+    
+    # Sin fila de encabezados <th>, la primera fila hace de encabezado
+    if not headers and rows:
+        headers = rows.pop(0)
+    
+    return headers, rows
+
+
+def rows_from_js(raw_rows):
+    """
+    Convierte el resultado de EXTRACT_TABLE_JS a (headers, rows)
+    
+    Normaliza los espacios igual que TableParser para que ambos motores
+    produzcan el mismo contenido.
+    
+    Args:
+        raw_rows (list): Resultado de driver.execute_script(EXTRACT_TABLE_JS, id)
+    
+    Returns:
+        tuple: (headers, rows) o (None, None) si la tabla no existe
+    """
+    if raw_rows is None:
+        return None, None
+    
+    parsed_rows = [
+        ([" ".join((celda or "").split()) for celda in celdas], encabezado)
+        for celdas, encabezado in raw_rows
+    ]
+    return split_header(parsed_rows)
+
+
+def table_fingerprint(headers, rows):
+    """
+    Calcula una huella barata del contenido de la tabla
+    
+    Args:
+        headers (list): Encabezados de la tabla
+        rows (list): Filas de la tabla
+    
+    Returns:
+        dict: {"filas": int, "hash": str}
+    """
+    contenido = json.dumps([headers, rows], ensure_ascii=False, separators=(",", ":"))
+    return {
+        "filas": len(rows),
+        "hash": hashlib.sha256(contenido.encode("utf-8")).hexdigest(),
+    }
+
+
+def write_excel_html(filepath, headers, rows, table_id="tblData"):
+    """
+    Escribe la tabla como HTML con extensión .xls
+    
+    Es el mismo formato que genera exportTableToExcel en el sitio, por lo que
+    Excel y el validador lo leen igual que una descarga desde el navegador.
+    La escritura es atómica: se escribe a un temporal y luego se renombra.
+    
+    Args:
+        filepath (str): Ruta destino
+        headers (list): Encabezados de la tabla
+        rows (list): Filas de la tabla
+        table_id (str): Atributo id de la tabla generada
+    """
+    partes = [
+        '<html><head><meta charset="utf-8"></head><body>',
+        f'<table id="{table_id}">',
+        "<tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr>",
+    ]
+    for row in rows:
+        partes.append("<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in row) + "</tr>")
+    partes.append("</table></body></html>")
+    
+    # Temporal oculto para que no aparezca en los glob de *.xls*
+    carpeta, nombre = os.path.split(filepath)
+    temp_path = os.path.join(carpeta, f".{nombre}.part")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(partes))
+    os.replace(temp_path, filepath)
+
+
+# Valores que el sitio usa para celdas sin dato
+EMPTY_VALUES = ("", "-", "--", "N/A", "n/a", "ND", "nd")
+
+# Número con comas solo como separador de miles (1,234 o 1,234,567.5)
+THOUSANDS_RE = re.compile(r"^-?\d{1,3}(,\d{3})+(\.\d+)?$")
+
+
+def coerce_column(values):
+    """
+    Convierte una columna de texto a números si todos sus valores lo permiten
+    
+    Acepta separadores de miles (1,234) y porcentajes (12.5%). Una coma que no
+    separa miles (12,5) deja la columna como texto en lugar de adivinar la escala.
+    
+    Args:
+        values (list): Textos de la columna
+    
+    Returns:
+        tuple: (valores convertidos, tipo) con tipo "entero", "decimal" o "texto"
+    """
+    convertidos = []
+    tipo = "entero"
+    
+    for valor in values:
+        texto = valor.strip()
+        if texto in EMPTY_VALUES:
+            convertidos.append(None)
+            continue
+        
+        limpio = texto.replace("%", "").replace("$", "").strip()
+        if "," in limpio:
+            if not THOUSANDS_RE.match(limpio):
+                return [v if v.strip() not in EMPTY_VALUES else None for v in values], "texto"
+            limpio = limpio.replace(",", "")
+        try:
+            convertidos.append(int(limpio))
+            continue
+        except ValueError:
+            pass
+        try:
+            convertidos.append(float(limpio))
+            tipo = "decimal"
+        except ValueError:
+            return [v if v.strip() not in EMPTY_VALUES else None for v in values], "texto"
+    
+    if all(v is None for v in convertidos):
+        return convertidos, "texto"
+    return convertidos, tipo
+
+
+def unique_headers(headers):
+    """
+    Garantiza nombres de columna únicos y no vacíos
+    
+    Args:
+        headers (list): Encabezados originales
+    
+    Returns:
+        list: Encabezados únicos (los repetidos reciben sufijo _2, _3...)
+    """
+    vistos = {}
+    resultado = []
+    for i, nombre in enumerate(headers, 1):
+        nombre = nombre or f"columna_{i}"
+        vistos[nombre] = vistos.get(nombre, 0) + 1
+        resultado.append(nombre if vistos[nombre] == 1 else f"{nombre}_{vistos[nombre]}")
+    return resultado
+
+
+def typed_columns(headers, rows):
+    """
+    Organiza la tabla por columnas con tipos inferidos
+    
+    Args:
+        headers (list): Encabezados de la tabla
+        rows (list): Filas de la tabla
+    
+    Returns:
+        list: Tuplas (nombre, valores, tipo) por columna
+    """
+    nombres = unique_headers(headers)
+    ancho = max([len(nombres)] + [len(r) for r in rows])
+    nombres += [f"columna_{i}" for i in range(len(nombres) + 1, ancho + 1)]
+    
+    columnas = []
+    for i, nombre in enumerate(nombres):
+        valores, tipo = coerce_column([r[i] if i < len(r) else "" for r in rows])
+        columnas.append((nombre, valores, tipo))
+    return columnas
+
+
+def write_typed_table(filepath, headers, rows, fmt="csv"):
+    """
+    Escribe la tabla con columnas tipadas en CSV o Parquet
+    
+    Parquet requiere pandas y pyarrow; CSV solo usa la biblioteca estándar.
+    
+    Args:
+        filepath (str): Ruta destino sin extensión
+        headers (list): Encabezados de la tabla
+        rows (list): Filas de la tabla
+        fmt (str): "csv" o "parquet"
+    
+    Returns:
+        str: Ruta del archivo escrito
+    """
+    columnas = typed_columns(headers, rows)
+    destino = f"{filepath}.{fmt}"
+    carpeta, nombre = os.path.split(destino)
+    temp_path = os.path.join(carpeta, f".{nombre}.part")
+    
+    if fmt == "parquet":
+        import pandas as pd
+        
+        dtypes = {"entero": "Int64", "decimal": "Float64", "texto": "string"}
+        df = pd.DataFrame({
+            nombre: pd.array(valores, dtype=dtypes[tipo]) for nombre, valores, tipo in columnas
+        })
+        df.to_parquet(temp_path, index=False)
+    elif fmt == "csv":
+        import csv
+        
+        with open(temp_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([nombre for nombre, _, _ in columnas])
+            for fila in zip(*[valores for _, valores, _ in columnas]):
+                writer.writerow(["" if v is None else v for v in fila])
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    
+    os.replace(temp_path, destino)
+    return destino
@@ -4,27 +4,49 @@ Valida integridad, tamaño y estructura de los archivos Excel
 """
 
 import os
-import glob
+import itertools
 from datetime import datetime
-import pandas as pd
 from pathlib import Path
 
-from config import FOLDERS, DATASETS
+from config import FOLDERS, DATASETS, VALIDATION_CONFIG
+from catalog import DownloadCatalog, dataset_outputs
+from history import RunHistory
+from tables import scan_table_file
+
+
+# Firmas de los formatos que puede tener un .xls/.xlsx descargado
+ZIP_MAGIC = b"PK\x03\x04"                      # xlsx (Office Open XML)
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # xls binario (BIFF)
 
 
 class FileValidator:
     """Validador de archivos descargados"""
     
-    def __init__(self):
+    def __init__(self, sync=False, use_cache=None):
+        """
+        Inicializa el validador
+        
+        Args:
+            sync (bool): Si es True, vuelve a registrar todos los archivos de la carpeta;
+                si no, solo se agregan los nuevos y se quitan los borrados
+            use_cache (bool): Reutilizar validaciones previas de archivos sin cambios
+                (por defecto VALIDATION_CONFIG["use_cache"])
+        """
         self.download_folder = FOLDERS["raw"]
         self.expected_datasets = [d["nombre"] for d in DATASETS]
+        self.catalog = DownloadCatalog()
+        self.use_cache = VALIDATION_CONFIG["use_cache"] if use_cache is None else use_cache
         
+        # Los archivos copiados o borrados a mano no pasan por register/remove
+        if os.path.isdir(self.download_folder):
+            self.catalog.sync_folder(self.download_folder, full=sync)
+    
     def get_downloaded_files(self):
-        """Obtiene lista de archivos descargados"""
-        files = glob.glob(f"{self.download_folder}/*.xls*")
-        return files
+        """Obtiene lista de archivos descargados desde el catálogo"""
+        return self.catalog.files(self.download_folder)
     
-    def validate_file_size(self, filepath, min_size_kb=1):
+    @staticmethod
+    def validate_file_size(filepath, min_size_kb=1):
         """
         Valida que el archivo tenga un tamaño mínimo
         
@@ -45,7 +67,56 @@ class FileValidator:
         
         return True, f"Tamaño OK: {size_kb:.2f} KB"
     
-    def validate_excel_structure(self, filepath):
+    @staticmethod
+    def read_structure(filepath):
+        """
+        Obtiene encabezados y número de filas sin cargar el archivo completo en memoria
+        
+        Detecta el formato por su firma: xlsx se recorre con openpyxl en modo
+        read_only, las tablas HTML (exportTableToExcel) se procesan por bloques
+        y solo el xls binario se lee completo con pandas.
+        
+        Args:
+            filepath (str): Ruta del archivo
+            
+        Returns:
+            tuple: (list, int) - (nombres de columnas, filas de datos)
+        """
+        with open(filepath, "rb") as f:
+            firma = f.read(len(OLE_MAGIC))
+        
+        if firma.startswith(ZIP_MAGIC):
+            from openpyxl import load_workbook
+            
+            libro = load_workbook(filepath, read_only=True, data_only=True)
+            try:
+                columnas, filas = None, 0
+                for fila in libro.worksheets[0].iter_rows(values_only=True):
+                    if all(valor is None for valor in fila):
+                        continue
+                    if columnas is None:
+                        columnas = list(fila)
+                        while columnas and columnas[-1] is None:
+                            columnas.pop()
+                    else:
+                        filas += 1
+                return columnas or [], filas
+            finally:
+                libro.close()
+        
+        if firma == OLE_MAGIC:
+            import pandas as pd
+            
+            df = pd.read_excel(filepath, sheet_name=0)
+            return list(df.columns), len(df)
+        
+        columnas, filas = scan_table_file(filepath)
+        if columnas is None:
+            raise ValueError("no se encontró ninguna tabla en el archivo")
+        return columnas, filas
+    
+    @staticmethod
+    def validate_excel_structure(filepath):
         """
         Valida que el Excel se pueda leer y tenga datos
         
@@ -56,59 +127,228 @@ class FileValidator:
             tuple: (bool, str, dict) - (válido, mensaje, info)
         """
         try:
-            # Intentar leer el archivo
-            df = pd.read_excel(filepath, sheet_name=0)
+            columnas, filas = FileValidator.read_structure(filepath)
             
             info = {
-                "filas": len(df),
-                "columnas": len(df.columns),
-                "columnas_nombres": list(df.columns)
+                "filas": filas,
+                "columnas": len(columnas),
+                "columnas_nombres": columnas
             }
             
-            if len(df) == 0:
+            if filas == 0:
                 return False, "Excel vacío (0 filas)", info
             
-            if len(df.columns) == 0:
+            if len(columnas) == 0:
                 return False, "Excel sin columnas", info
             
-            return True, f"Excel válido: {len(df)} filas x {len(df.columns)} columnas", info
+            return True, f"Excel válido: {filas} filas x {len(columnas)} columnas", info
             
         except Exception as e:
             return False, f"Error al leer Excel: {str(e)}", {}
     
-    def check_dataset_coverage(self):
+    @staticmethod
+    def freshness(timestamp, now, max_age_days, checked=None):
         """
-        Verifica qué datasets se descargaron
+        Calcula la antigüedad de una descarga a partir del timestamp de su nombre
+        
+        Args:
+            timestamp (str): Timestamp en formato YYYYmmdd_HHMMSS
+            now (datetime): Momento de referencia
+            max_age_days (float): Antigüedad máxima aceptada
+            checked (datetime): Última extracción exitosa según el historial; si es
+                posterior a la descarga (página sin cambios), la antigüedad se cuenta desde ella
+            
+        Returns:
+            dict: {"ultimo", "verificado", "antiguedad_dias", "vigente"}
+        """
+        fecha = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+        verificado = checked if checked is not None and checked > fecha else None
+        edad = (now - (verificado or fecha)).total_seconds() / 86400
+        return {
+            "ultimo": timestamp,
+            "verificado": verificado.strftime("%Y%m%d_%H%M%S") if verificado else None,
+            "antiguedad_dias": edad,
+            "vigente": edad <= max_age_days
+        }
+    
+    def check_dataset_coverage(self, max_age_days=None):
+        """
+        Verifica qué datasets se descargaron y qué tan recientes son
+        
+        Usa el índice de salidas del catálogo (nombre antes del timestamp) y lo
+        relaciona exactamente con cada dataset y variante de filtro.
+        Un dataset con filtros cuenta como encontrado solo si tiene todas sus
+        variantes, y su antigüedad es la de la variante más antigua. Los datasets
+        omitidos por no tener cambios se cuentan desde su última verificación
+        en el historial de ejecuciones, igual que en el planificador.
+        
+        Args:
+            max_age_days (float): Antigüedad máxima en días
+                (por defecto VALIDATION_CONFIG["max_age_days"])
         
         Returns:
             dict: Información de cobertura
         """
-        files = self.get_downloaded_files()
-        file_basenames = [os.path.basename(f) for f in files]
+        if max_age_days is None:
+            max_age_days = VALIDATION_CONFIG["max_age_days"]
+        
+        now = datetime.now()
+        latest = self.catalog.latest_per_output()
+        history = RunHistory()
+        try:
+            verificados = history.last_success()
+        finally:
+            history.close()
+        
+        # Variantes esperadas de cada dataset
+        variantes = {nombre: [] for nombre in self.expected_datasets}
+        for salida, (dataset, _) in dataset_outputs(discovered=self.catalog.variants()).items():
+            variantes[dataset].append(salida)
         
         found = []
         missing = []
+        stale = []
+        detalle = {}
         
         for dataset_name in self.expected_datasets:
-            # Buscar si algún archivo contiene el nombre del dataset
-            dataset_found = any(dataset_name in basename for basename in file_basenames)
+            por_variante = {
+                salida: self.freshness(
+                    latest[salida]["timestamp"], now, max_age_days, verificados.get(dataset_name)
+                ) if salida in latest else None
+                for salida in variantes[dataset_name]
+            }
+            presentes = [v for v in por_variante.values() if v]
             
-            if dataset_found:
+            # Un dataset con "filtros": [] sin opciones descubiertas aún no tiene salidas
+            if por_variante and len(presentes) == len(por_variante):
+                estado = max(presentes, key=lambda v: v["antiguedad_dias"])
                 found.append(dataset_name)
+                if not estado["vigente"]:
+                    stale.append(dataset_name)
             else:
+                estado = None
                 missing.append(dataset_name)
+            
+            detalle[dataset_name] = {
+                "estado": estado,
+                "variantes": por_variante if dataset_name not in por_variante else {}
+            }
         
         return {
             "total_esperados": len(self.expected_datasets),
             "encontrados": len(found),
             "faltantes": len(missing),
+            "desactualizados": len(stale),
             "lista_encontrados": found,
             "lista_faltantes": missing,
+            "lista_desactualizados": stale,
+            "detalle": detalle,
+            "max_age_days": max_age_days,
             "cobertura_pct": (len(found) / len(self.expected_datasets)) * 100
         }
     
-    def generate_report(self):
-        """Genera un reporte completo de validación"""
+    def print_coverage_detail(self, coverage):
+        """Imprime la última descarga y la antigüedad de cada dataset y variante"""
+        for dataset_name, detalle in coverage["detalle"].items():
+            estado = detalle["estado"]
+            if estado:
+                marca = "✓" if estado["vigente"] else "⚠️ "
+                verificado = f", sin cambios al {estado['verificado']}" if estado["verificado"] else ""
+                print(f"  {marca} {dataset_name}: {estado['ultimo']} ({estado['antiguedad_dias']:.1f} días{verificado})")
+            else:
+                print(f"  ✗ {dataset_name}: sin descarga completa")
+            
+            for salida, variante in detalle["variantes"].items():
+                if variante:
+                    print(f"      - {salida}: {variante['ultimo']} ({variante['antiguedad_dias']:.1f} días)")
+                else:
+                    print(f"      - {salida}: faltante")
+    
+    def split_cached(self, files):
+        """
+        Separa los archivos con una validación vigente en caché de los que hay que validar
+        
+        Los archivos que ya no existen se eliminan del catálogo y no aparecen en
+        ninguna de las dos listas.
+        
+        Args:
+            files (list): Rutas de los archivos
+            
+        Returns:
+            tuple: (list, list, dict) - (resultados en caché, archivos pendientes,
+                {ruta: (tamaño, mtime_ns)} de los pendientes)
+        """
+        cached = []
+        pending = []
+        stats = {}
+        
+        for filepath in files:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                # Se borró del disco después de registrarlo: deja de contar como descarga
+                self.catalog.remove(filepath)
+                continue
+            
+            result = self.catalog.cached_validation(filepath, st.st_size, st.st_mtime_ns) if self.use_cache else None
+            if result:
+                cached.append(result)
+            else:
+                pending.append(filepath)
+                stats[filepath] = (st.st_size, st.st_mtime_ns)
+        
+        return cached, pending, stats
+    
+    def validate_files(self, files, workers=1):
+        """
+        Valida tamaño y estructura de varios archivos
+        
+        Con más de un worker reparte los archivos en un pool de procesos y
+        entrega los resultados a medida que terminan.
+        
+        Args:
+            files (list): Rutas de los archivos
+            workers (int): Número de procesos
+            
+        Yields:
+            dict: Resultado de validate_file() por archivo
+        """
+        if workers <= 1 or len(files) <= 1:
+            for filepath in files:
+                yield validate_file(filepath)
+            return
+        
+        # multiprocessing solo se importa si de verdad hay que validar en paralelo
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            futures = [executor.submit(validate_file, filepath) for filepath in files]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def print_file_result(self, i, total, result):
+        """Imprime la validación de un archivo"""
+        print(f"\n[{i}/{total}] {os.path.basename(result['ruta'])}")
+        print(f"  Tamaño: {'✓' if result['size_valid'] else '✗'} {result['size_msg']}")
+        print(f"  Estructura: {'✓' if result['struct_valid'] else '✗'} {result['struct_msg']}")
+        
+        info = result["info"]
+        if result["struct_valid"] and info:
+            nombres = [str(c) for c in info["columnas_nombres"]]
+            print(f"  Columnas: {', '.join(nombres[:5])}{'...' if len(nombres) > 5 else ''}")
+    
+    def generate_report(self, workers=None, cached_only=False):
+        """
+        Genera un reporte completo de validación
+        
+        Args:
+            workers (int): Procesos para validar en paralelo
+                (por defecto VALIDATION_CONFIG["workers"]; 0 = todos los núcleos)
+            cached_only (bool): Reportar solo las validaciones en caché, sin leer archivos
+            
+        Returns:
+            dict: Conteos del reporte o None si no hay archivos
+        """
         print("\n" + "="*80)
         print("REPORTE DE VALIDACIÓN DE ARCHIVOS")
         print("="*80)
@@ -120,7 +360,7 @@ class FileValidator:
         
         if not files:
             print("\n⚠️  No se encontraron archivos descargados")
-            return
+            return None
         
         print("\n" + "-"*80)
         print("VALIDACIÓN INDIVIDUAL DE ARCHIVOS")
@@ -129,22 +369,39 @@ class FileValidator:
         valid_files = 0
         invalid_files = 0
         
-        for i, filepath in enumerate(files, 1):
-            filename = os.path.basename(filepath)
-            print(f"\n[{i}/{len(files)}] {filename}")
-            
-            # Validar tamaño
-            size_valid, size_msg = self.validate_file_size(filepath, min_size_kb=1)
-            print(f"  Tamaño: {'✓' if size_valid else '✗'} {size_msg}")
-            
-            # Validar estructura
-            struct_valid, struct_msg, info = self.validate_excel_structure(filepath)
-            print(f"  Estructura: {'✓' if struct_valid else '✗'} {struct_msg}")
+        if workers is None:
+            workers = VALIDATION_CONFIG["workers"] or os.cpu_count()
+        
+        # Solo se leen los archivos nuevos o modificados desde su última validación
+        self.catalog.prune_validations()
+        cached, pending, stats = self.split_cached(files)
+        files = [r["ruta"] for r in cached] + pending
+        if not files:
+            print("\n⚠️  Los archivos del catálogo ya no existen en disco")
+            return None
+        if cached:
+            print(f"\nValidaciones reutilizadas de la caché: {len(cached)}")
+        
+        if cached_only:
+            results = cached
+            total = len(cached)
+            if pending:
+                print(f"Archivos sin validación en caché (se omiten): {len(pending)}")
+        else:
+            # Primero los resultados en caché y luego los nuevos, en el orden en que terminan
+            results = itertools.chain(cached, self.validate_files(pending, workers))
+            total = len(files)
+            pending = []
+        
+        for i, result in enumerate(results, 1):
+            self.print_file_result(i, total, result)
             
-            if struct_valid and info:
-                print(f"  Columnas: {', '.join(info['columnas_nombres'][:5])}{'...' if len(info['columnas_nombres']) > 5 else ''}")
+            if result["ruta"] in stats:
+                self.catalog.save_validation(result, *stats[result["ruta"]])
+                if result["info"]:
+                    self.catalog.update_structure(result["ruta"], result["info"]["filas"], result["info"]["columnas"])
             
-            if size_valid and struct_valid:
+            if result["size_valid"] and result["struct_valid"]:
                 valid_files += 1
             else:
                 invalid_files += 1
@@ -159,8 +416,12 @@ class FileValidator:
         print(f"\nTotal esperado: {coverage['total_esperados']}")
         print(f"Encontrados: {coverage['encontrados']} ✓")
         print(f"Faltantes: {coverage['faltantes']} ✗")
+        print(f"Desactualizados (> {coverage['max_age_days']} días): {coverage['desactualizados']}")
         print(f"Cobertura: {coverage['cobertura_pct']:.1f}%")
         
+        print()
+        self.print_coverage_detail(coverage)
+        
         if coverage['lista_faltantes']:
             print(f"\n⚠️  Datasets faltantes:")
             for dataset in coverage['lista_faltantes']:
@@ -172,16 +433,54 @@ class FileValidator:
         print("="*80)
         print(f"Archivos válidos: {valid_files} ✓")
         print(f"Archivos inválidos: {invalid_files} ✗")
+        if pending:
+            print(f"Archivos sin validar: {len(pending)}")
         print(f"Tasa de validación: {(valid_files/len(files)*100):.1f}%")
         
-        if valid_files == len(files) and coverage['faltantes'] == 0:
+        if valid_files == len(files) and coverage['faltantes'] == 0 and coverage['desactualizados'] == 0:
             print("\n🎉 ¡TODAS LAS VALIDACIONES PASARON!")
         elif invalid_files > 0:
             print("\n⚠️  Hay archivos con problemas que requieren atención")
         elif coverage['faltantes'] > 0:
             print("\n⚠️  Faltan datasets por descargar")
+        elif coverage['desactualizados'] > 0:
+            print("\n⚠️  Hay datasets con descargas desactualizadas")
+        elif pending:
+            print("\n⚠️  Hay archivos sin validar (ejecuta la validación sin --cached)")
         
         print("="*80)
+        
+        return {
+            "archivos": len(files),
+            "validos": valid_files,
+            "invalidos": invalid_files,
+            "sin_validar": len(pending),
+            "faltantes": coverage["faltantes"],
+            "desactualizados": coverage["desactualizados"],
+        }
+
+
+def validate_file(filepath):
+    """
+    Valida tamaño y estructura de un archivo (función de nivel de módulo para el pool de procesos)
+    
+    Args:
+        filepath (str): Ruta del archivo
+        
+    Returns:
+        dict: Resultado con ruta, validez, mensajes e info de estructura
+    """
+    size_valid, size_msg = FileValidator.validate_file_size(filepath, min_size_kb=1)
+    struct_valid, struct_msg, info = FileValidator.validate_excel_structure(filepath)
+    
+    return {
+        "ruta": filepath,
+        "size_valid": size_valid,
+        "size_msg": size_msg,
+        "struct_valid": struct_valid,
+        "struct_msg": struct_msg,
+        "info": info,
+    }
 
 
 def main():